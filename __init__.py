@@ -1,6 +1,8 @@
 
+from . import cache
+from . import instrumentation
 from . import relative
 from .exceptions import *
 from .classes import *
 
-__all__ = ['TimerangeWarning', 'MixedTimeUnitsWarning', 'Delta', 'Point', 'Range', 'relative']
\ No newline at end of file
+__all__ = ['TimerangeWarning', 'MixedTimeUnitsWarning', 'AmbiguousDSTWarning', 'PrecisionLossWarning', 'Delta', 'Point', 'Range', 'cache', 'instrumentation', 'relative']
\ No newline at end of file
@@ -0,0 +1,489 @@
+"""
+Array-backed counterparts of the scalar classes, for bulk processing.
+
+Requires numpy; pandas is used when installed. The package itself does not
+import this module, so both stay optional dependencies.
+"""
+from . import transitions
+from .classes import Delta, Timestamp, Timezone
+from .exceptions import AmbiguousDSTWarning, PrecisionLossWarning
+
+import math
+import warnings
+
+from collections import namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Picoseconds per numpy datetime64/timedelta64 unit.
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+_DEFAULTS = (1, 1, 1, 0, 0, 0, 0, 0, 0, 0)
+
+UNITS = {'W': 7 * 86400 * 10 ** 12,
+         'D': 86400 * 10 ** 12,
+         'h': 3600 * 10 ** 12,
+         'm': 60 * 10 ** 12,
+         's': 10 ** 12,
+         'ms': 10 ** 9,
+         'us': 10 ** 6,
+         'ns': 1000,
+         'ps': 1}
+
+INT64_MAX = 2 ** 63 - 1
+
+LocalFields = namedtuple('LocalFields', ['year', 'month', 'day', 'hour', 'minute', 'second',
+                                         'picosecond', 'weekday', 'utcoffset', 'dst'])
+
+_transitions = {}
+
+
+def _numpy():
+    if numpy is None:
+        raise ImportError('Array support requires numpy.')
+    return numpy
+
+
+def _pandas():
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError('pandas interoperability requires pandas.') from None
+    return pandas
+
+
+class _PartsArray:
+    """
+    Two int64 columns: whole seconds, rounded down, and picoseconds past
+    those seconds, in [0, 10 ** 12). A single int64 of picoseconds would
+    only span ±106 days. An absent picosecond column means all zeros and is
+    only materialized when accessed.
+    """
+
+    _kind = None
+    _dtype = None
+
+    def __init__(self, seconds, picoseconds=None):
+        np = _numpy()
+        seconds = np.asarray(seconds)
+        if seconds.dtype.kind not in 'iu':
+            raise TypeError('Parameter \'seconds\' must be an integer array.')
+        seconds = seconds.astype(np.int64, copy=False)
+
+        if picoseconds is not None:
+            picoseconds = np.asarray(picoseconds)
+            if picoseconds.dtype.kind not in 'iu':
+                raise TypeError('Parameter \'picoseconds\' must be an integer array.')
+            if picoseconds.shape != seconds.shape:
+                raise ValueError('Parameters \'seconds\' and \'picoseconds\' differ in shape.')
+            picoseconds = picoseconds.astype(np.int64, copy=False)
+            if picoseconds.size and (picoseconds.min() < 0 or picoseconds.max() >= 10 ** 12):
+                carry, picoseconds = np.divmod(picoseconds, 10 ** 12)
+                seconds = seconds + carry
+
+        self.__s = seconds
+        self.__p = picoseconds
+
+    @classmethod
+    def from_seconds(cls, seconds):
+        """From seconds. Floats are rounded to μs."""
+        np = _numpy()
+        seconds = np.asarray(seconds)
+        if seconds.dtype.kind in 'iu':
+            return cls(seconds)
+        whole = np.floor(seconds)
+        micro = np.rint((seconds - whole) * 1e6).astype(np.int64)
+        return cls(whole.astype(np.int64), micro * 10 ** 6)
+
+    @classmethod
+    def from_ns(cls, nanoseconds):
+        """From integer nanoseconds."""
+        np = _numpy()
+        seconds, nanoseconds = np.divmod(np.asarray(nanoseconds, dtype=np.int64), 10 ** 9)
+        return cls(seconds, nanoseconds * 1000)
+
+    @classmethod
+    def from_ps(cls, picoseconds):
+        """From integer picoseconds (int64, so ±106 days)."""
+        np = _numpy()
+        seconds, picoseconds = np.divmod(np.asarray(picoseconds, dtype=np.int64), 10 ** 12)
+        return cls(seconds, picoseconds)
+
+    @classmethod
+    def from_parts(cls, seconds, picoseconds=0):
+        """From integer seconds plus a non-negative picosecond offset."""
+        np = _numpy()
+        seconds = np.asarray(seconds)
+        return cls(seconds, np.broadcast_to(np.asarray(picoseconds), seconds.shape))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self)} values'
+
+    def __len__(self):
+        return len(self.__s)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice) or not numpy.isscalar(item):
+            return self.__class__(self.__s[item], None if self.__p is None else self.__p[item])
+        return self._scalar(int(self.__s[item]), 0 if self.__p is None else int(self.__p[item]))
+
+    def __iter__(self):
+        for _s, _p in zip(self.__s.tolist(), self.p.tolist()):
+            yield self._scalar(_s, _p)
+
+    @property
+    def s(self):
+        return self.__s
+
+    @property
+    def p(self):
+        if self.__p is None:
+            self.__p = numpy.zeros(self.__s.shape, dtype=numpy.int64)
+        return self.__p
+
+    @property
+    def exact_seconds(self):
+        """Whether all values are whole seconds."""
+        return self.__p is None or not self.__p.any()
+
+    def _scalar(self, seconds, picoseconds):
+        raise NotImplementedError()
+
+    @classmethod
+    def _from_numpy64(cls, values):
+        np = _numpy()
+        values = np.asarray(values)
+        if values.dtype.kind != cls._kind:
+            raise TypeError(f'Expected a {cls._dtype} array.')
+        unit, count = np.datetime_data(values.dtype)
+        if unit not in UNITS:
+            raise ValueError(f'Unsupported unit \'{unit}\'.')
+
+        ints = values.view(np.int64)
+        if ints.size and np.isnat(values).any():
+            raise ValueError('NaT values are not supported.')
+
+        scale = UNITS[unit] * count
+        if scale == 10 ** 12:
+            # Shares the buffer of ``values``.
+            return cls(ints)
+        if scale % 10 ** 12 == 0:
+            return cls(ints * (scale // 10 ** 12))
+        # ``per_second // gcd`` units make a whole ``scale // gcd`` seconds.
+        divisor = math.gcd(scale, 10 ** 12)
+        if scale // divisor * 10 ** 12 > INT64_MAX:
+            raise ValueError(f'Unsupported unit \'{count}{unit}\'.')
+        units, rest = np.divmod(ints, 10 ** 12 // divisor)
+        seconds, picoseconds = np.divmod(rest * scale, 10 ** 12)
+        return cls(units * (scale // divisor) + seconds, picoseconds)
+
+    def _to_numpy64(self, unit, lossy):
+        np = _numpy()
+        if unit not in UNITS or UNITS[unit] > 10 ** 12:
+            raise ValueError(f'Unsupported unit \'{unit}\'.')
+        if lossy not in ('warn', 'raise', 'ignore'):
+            raise ValueError(f'Unknown lossy option \'{lossy}\'.')
+        dtype = f'{self._dtype}[{unit}]'
+
+        scale = UNITS[unit]
+        per_second = 10 ** 12 // scale
+        limit = INT64_MAX // per_second - 1
+        if self.__s.size and (self.__s.max() > limit or self.__s.min() < -limit):
+            raise OverflowError(f'Values out of range for {dtype}.')
+
+        if self.exact_seconds:
+            if per_second == 1:
+                # Shares the buffer of `s`.
+                return self.__s.view(dtype)
+            return (self.__s * per_second).view(dtype)
+
+        sub, rest = np.divmod(self.__p, scale)
+        lost = np.count_nonzero(rest)
+        if lost and lossy != 'ignore':
+            message = f'{lost} of {len(self)} values lose precision below 1 {unit}.'
+            if lossy == 'raise':
+                raise ValueError(message)
+            warnings.warn(message, PrecisionLossWarning, stacklevel=3)
+        return (self.__s * per_second + sub).view(dtype)
+
+
+class TimestampArray(_PartsArray):
+    """Array of timestamps, i.e. the columnar form of `Timestamp.s` and `Timestamp.p`."""
+
+    _kind = 'M'
+    _dtype = 'datetime64'
+
+    @classmethod
+    def from_timestamps(cls, timestamps):
+        """From an iterable of `Timestamp` objects."""
+        np = _numpy()
+        timestamps = list(timestamps)
+        return cls(np.fromiter((t.s for t in timestamps), dtype=np.int64, count=len(timestamps)),
+                   np.fromiter((t.p for t in timestamps), dtype=np.int64, count=len(timestamps)))
+
+    @classmethod
+    def from_datetime64(cls, values):
+        """From a numpy datetime64 array of any unit from weeks to picoseconds."""
+        return cls._from_numpy64(values)
+
+    def to_datetime64(self, unit='ns', lossy='warn'):
+        """
+        To a numpy datetime64 array of unit 's', 'ms', 'us', 'ns' or 'ps'.
+
+        :param lossy: what to do when values have precision below ``unit``:
+            'warn' (PrecisionLossWarning), 'raise' (ValueError) or 'ignore';
+            such values are truncated.
+        """
+        return self._to_numpy64(unit, lossy)
+
+    @classmethod
+    def from_pandas(cls, values):
+        """From a pandas DatetimeIndex or datetime Series; tz-aware data is read as utc."""
+        _pandas()
+        if hasattr(values, 'dt') and values.dt.tz is not None:
+            values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+        elif getattr(values, 'tz', None) is not None:
+            values = values.tz_convert('UTC').tz_localize(None)
+        return cls.from_datetime64(values.to_numpy())
+
+    def to_pandas(self, timezone=None, unit='ns', lossy='warn'):
+        """To a pandas DatetimeIndex, tz-aware when a timezone is given."""
+        pandas = _pandas()
+        index = pandas.DatetimeIndex(self.to_datetime64(unit, lossy))
+        if timezone is not None:
+            index = index.tz_localize('UTC').tz_convert(str(timezone))
+        return index
+
+    @classmethod
+    def from_wall(cls, seconds, picoseconds=None, timezone=None, dst=None):
+        """
+        From integer wall-clock seconds in a timezone, counted as if they
+        were utc, plus picoseconds. Wall times that are ambiguous or
+        non-existent due to a dst transition are resolved according to
+        ``dst``, as in `Point.from_components`.
+        """
+        np = _numpy()
+        if dst not in transitions.DST_OPTIONS:
+            raise ValueError(f'Unknown dst option \'{dst}\'.')
+        wall = np.asarray(seconds, dtype=np.int64)
+        times, offsets, _ = _transition_arrays(Timezone(timezone))
+        offsets = offsets.astype(np.int64)
+        ends = np.append(times[1:], INT64_MAX)
+
+        # Every period within a day of the wall time is a candidate.
+        lo = np.maximum(np.searchsorted(times, wall - transitions.MAX_OFFSET, side='right') - 1, 0)
+        hi = np.searchsorted(times, wall + transitions.MAX_OFFSET, side='right')
+        earliest = np.full(wall.shape, INT64_MAX)
+        latest = np.full(wall.shape, -INT64_MAX - 1)
+        count = np.zeros(wall.shape, np.int64)
+        for k in range(int((hi - lo).max()) if wall.size else 0):
+            i = np.minimum(lo + k, len(times) - 1)
+            utc = wall - offsets[i]
+            valid = (lo + k < hi) & (times[i] <= utc) & (utc < ends[i])
+            earliest = np.where(valid, np.minimum(earliest, utc), earliest)
+            latest = np.where(valid, np.maximum(latest, utc), latest)
+            count += valid
+
+        shifted = latest.copy()
+        gap = count == 0
+        if gap.any():
+            # Skipped wall times lie between transition i's start in the old
+            # offset and its start in the new one.
+            i = np.searchsorted(times[1:] + offsets[:-1], wall[gap], side='right')
+            earliest[gap] = wall[gap] - offsets[i]
+            latest[gap] = wall[gap] - offsets[i - 1]
+            shifted[gap] = times[i]
+
+        unclear = count != 1
+        if unclear.any():
+            if dst == 'raise':
+                raise ValueError(f'{np.count_nonzero(unclear)} wall times are ambiguous or '
+                                 f'non-existent due to a dst transition.')
+            if dst is None:
+                warnings.warn(f'{np.count_nonzero(unclear)} wall times are ambiguous or non-existent '
+                              f'due to a dst transition; resolving to the latest candidates.',
+                              AmbiguousDSTWarning, stacklevel=2)
+        if dst == 'earliest':
+            utc = earliest
+        elif dst == 'shift_forward':
+            utc = shifted
+        else:
+            utc = latest
+        return cls(utc, picoseconds)
+
+    @classmethod
+    def from_components(cls, components, timezone=None, dst=None):
+        """
+        From wall-clock components in a timezone, localized at once.
+
+        :param components: (n, k) integer array, or iterable of sequences,
+            of at most 10 components each, see `Point.from_components`.
+        :param timezone:
+        :param dst: see `from_wall`.
+        """
+        np = _numpy()
+        if not isinstance(components, np.ndarray):
+            rows = [tuple(row) for row in components]
+            lengths = set(map(len, rows))
+            if max(lengths, default=0) > 10:
+                raise TypeError(f'At most 10 components allowed ({max(lengths)} given)')
+            if len(lengths) > 1:
+                rows = [row + _DEFAULTS[len(row):] for row in rows]
+            components = np.array(rows, np.int64).reshape(len(rows), -1) if rows else np.zeros((0, 0), np.int64)
+
+        matrix = components.astype(np.int64, copy=False)
+        if matrix.ndim != 2:
+            raise ValueError('Parameter \'components\' must be two-dimensional.')
+        width = matrix.shape[1]
+        if width > 10:
+            raise TypeError(f'At most 10 components allowed ({width} given)')
+        if width < 10:
+            defaults = np.broadcast_to(np.array(_DEFAULTS[width:], np.int64), (len(matrix), 10 - width))
+            matrix = np.hstack([matrix, defaults])
+
+        if (matrix[:, :3] < 1).any() or (matrix[:, 3:] < 0).any():
+            raise ValueError('Component values must be positive.')
+        year, month, day, hour, minute, second = matrix[:, :6].T
+        if ((year > 9999) | (month > 12) | (day > _month_days(year, month)) |
+                (hour > 23) | (minute > 59) | (second > 59)).any():
+            raise ValueError('Component values out of range.')
+
+        wall = _civil_days(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+        carry, picoseconds = np.divmod(matrix[:, 6] * 10 ** 9 + matrix[:, 7] * 10 ** 6 +
+                                       matrix[:, 8] * 1000 + matrix[:, 9], 10 ** 12)
+        return cls(cls.from_wall(wall, timezone=timezone, dst=dst).s + carry, picoseconds)
+
+    def utcoffset(self, timezone=None):
+        """
+        Utc offsets in seconds (int32) and dst flags (bool) of all timestamps
+        in a timezone, found with one search over its transition times.
+        """
+        np = _numpy()
+        times, offsets, dsts = _transition_arrays(Timezone(timezone))
+        index = np.searchsorted(times, self.s, side='right') - 1
+        np.maximum(index, 0, out=index)
+        return offsets[index], dsts[index]
+
+    def local_fields(self, timezone=None, chunk=2 ** 20):
+        """
+        Wall-clock fields of all timestamps in a timezone, as columns.
+
+        Returns `LocalFields` of year, month, day, hour, minute, second,
+        picosecond, ISO weekday (Monday is 1), utc offset in seconds and dst
+        flag arrays. Work is done ``chunk`` timestamps at a time to bound
+        the memory used by intermediates.
+        """
+        np = _numpy()
+        n = len(self)
+        fields = LocalFields(np.empty(n, np.int32), np.empty(n, np.int8), np.empty(n, np.int8),
+                             np.empty(n, np.int8), np.empty(n, np.int8), np.empty(n, np.int8),
+                             self.p, np.empty(n, np.int8), np.empty(n, np.int32), np.empty(n, bool))
+
+        for lo in range(0, n, chunk):
+            part = slice(lo, lo + chunk)
+            utcoffset, dst = self[part].utcoffset(timezone)
+            days, seconds = np.divmod(self.s[part] + utcoffset, 86400)
+
+            # Civil date from days since the epoch (proleptic Gregorian).
+            z = days + 719468
+            era = z // 146097
+            doe = z - era * 146097
+            yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+            doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+            mp = (5 * doy + 2) // 153
+            month = np.where(mp < 10, mp + 3, mp - 9)
+
+            fields.year[part] = yoe + era * 400 + (month <= 2)
+            fields.month[part] = month
+            fields.day[part] = doy - (153 * mp + 2) // 5 + 1
+            fields.hour[part] = seconds // 3600
+            fields.minute[part] = seconds // 60 % 60
+            fields.second[part] = seconds % 60
+            fields.weekday[part] = (days + 3) % 7 + 1
+            fields.utcoffset[part] = utcoffset
+            fields.dst[part] = dst
+        return fields
+
+    def _scalar(self, seconds, picoseconds):
+        return Timestamp.from_parts(seconds, picoseconds)
+
+    @property
+    def timestamp(self):
+        """Seconds since the epoch as float64."""
+        return self.s + self.p / 10 ** 12
+
+
+class DeltaArray(_PartsArray):
+    """Array of exact Deltas."""
+
+    _kind = 'm'
+    _dtype = 'timedelta64'
+
+    @classmethod
+    def from_deltas(cls, deltas):
+        """From an iterable of exact `Delta` objects."""
+        np = _numpy()
+        deltas = list(deltas)
+        if any(delta.relative for delta in deltas):
+            raise ValueError('DeltaArray only holds exact Deltas.')
+        values = [delta.key for delta in deltas]
+        return cls(np.fromiter((v // 10 ** 12 for v in values), dtype=np.int64, count=len(values)),
+                   np.fromiter((v % 10 ** 12 for v in values), dtype=np.int64, count=len(values)))
+
+    @classmethod
+    def from_timedelta64(cls, values):
+        """From a numpy timedelta64 array of any unit from weeks to picoseconds."""
+        return cls._from_numpy64(values)
+
+    def to_timedelta64(self, unit='ns', lossy='warn'):
+        """To a numpy timedelta64 array; see `TimestampArray.to_datetime64`."""
+        return self._to_numpy64(unit, lossy)
+
+    @classmethod
+    def from_pandas(cls, values):
+        """From a pandas TimedeltaIndex or timedelta Series."""
+        _pandas()
+        return cls.from_timedelta64(values.to_numpy())
+
+    def to_pandas(self, unit='ns', lossy='warn'):
+        """To a pandas TimedeltaIndex."""
+        return _pandas().TimedeltaIndex(self.to_timedelta64(unit, lossy))
+
+    def _scalar(self, seconds, picoseconds):
+        return Delta(seconds=seconds, picoseconds=picoseconds)
+
+    @property
+    def seconds(self):
+        """Seconds as float64."""
+        return self.s + self.p / 10 ** 12
+
+
+def _transition_arrays(timezone):
+    try:
+        return _transitions[timezone.name]
+    except KeyError:
+        pass
+    table = timezone.transitions
+    arrays = (numpy.asarray(table.times, dtype=numpy.int64),
+              numpy.asarray(table.offsets, dtype=numpy.int32),
+              numpy.asarray(table.dsts, dtype=numpy.int32) != 0)
+    return _transitions.setdefault(timezone.name, arrays)
+
+
+def _month_days(year, month):
+    """Number of days of the months, for arrays of years and months."""
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return numpy.array(MONTH_DAYS)[numpy.clip(month - 1, 0, 11)] + ((month == 2) & leap)
+
+
+def _civil_days(year, month, day):
+    """Days since the epoch of civil dates (proleptic Gregorian)."""
+    y = year - (month <= 2)
+    era = y // 400
+    yoe = y - era * 400
+    doy = (153 * numpy.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
@@ -0,0 +1,99 @@
+"""
+Calendar bucket boundaries of a Unit in a Timezone.
+
+Boundaries are generated incrementally in wall-clock time and resolved
+against the zone's cached transition table, so days can be 23 or 25 hours
+long. Units of an hour and smaller are stepped in exact time from each
+local midnight.
+"""
+from . import transitions
+
+from datetime import datetime as dtdt
+
+from .classes import Timestamp, Timezone, Unit
+
+DAY = 86400
+
+# Units whose buckets do not tile the time line.
+NON_TILING = ('workweek', 'night', 'morning', 'afternoon', 'evening')
+
+EXACT = {'hour': 3600 * 10 ** 12,
+         'minute': 60 * 10 ** 12,
+         'second': 10 ** 12,
+         'millisecond': 10 ** 9,
+         'microsecond': 10 ** 6,
+         'nanosecond': 1000,
+         'picosecond': 1}
+
+
+def floor(timestamp, unit=None, timezone=None):
+    """Start of the bucket of ``unit`` containing a Point or Timestamp."""
+    return next(boundaries(timestamp, unit, timezone))
+
+
+def boundaries(start, unit=None, timezone=None):
+    """
+    Endless generator of bucket starts, as Timestamps, beginning with the
+    bucket containing ``start``.
+    """
+    timestamp = getattr(start, 'timestamp', start)
+    if timezone is None:
+        timezone = getattr(start, 'timezone', None)
+    par, n = _unit(unit)
+    for boundary in _boundaries(timestamp._value, par, n, Timezone(timezone).transitions):
+        yield Timestamp.from_ps(boundary)
+
+
+def _unit(unit):
+    if not isinstance(unit, Unit):
+        unit = Unit(unit)
+    if unit.unit in NON_TILING:
+        raise ValueError(f'Unit \'{unit.unit}\' does not divide time into buckets.')
+    (par, n), = unit.floor_options.items()
+    return par, n
+
+
+def _localize(_transitions, day):
+    return transitions.localize(_transitions, day * DAY, 'shift_forward') * 10 ** 12
+
+
+def _boundaries(start, par, n, _transitions):
+    """Bucket starts in picoseconds, beginning with the bucket of ``start``."""
+    seconds = start // 10 ** 12
+    day = (seconds + transitions.utcoffset(_transitions, seconds)) // DAY
+    if _localize(_transitions, day) > start:
+        # Wall-clock day of a shifted-forward midnight.
+        day -= 1
+
+    if par in ('year', 'month'):
+        date = dtdt.fromordinal(day + transitions.EPOCH_ORDINAL)
+        if par == 'year':
+            step = n * 12
+            index = date.year // n * n * 12
+        else:
+            step = n
+            index = (date.year * 12 + date.month - 1) // n * n
+        while True:
+            year, month = divmod(index, 12)
+            yield _localize(_transitions, dtdt(year, month + 1, 1).toordinal() - transitions.EPOCH_ORDINAL)
+            index += step
+
+    elif par in ('week', 'day'):
+        # Days since the epoch plus 3 puts weeks on mondays.
+        step, shift = (n * 7, 3) if par == 'week' else (n, 0)
+        day = (day + shift) // step * step - shift
+        while True:
+            yield _localize(_transitions, day)
+            day += step
+
+    else:
+        step = EXACT[par] * n
+        day_start = _localize(_transitions, day)
+        boundary = day_start + (start - day_start) // step * step
+        while True:
+            day += 1
+            next_day = _localize(_transitions, day)
+            while boundary < next_day:
+                yield boundary
+                boundary += step
+            boundary = next_day
@@ -0,0 +1,159 @@
+"""
+Bounded, thread-safe memoization for relative-unit normalization.
+
+`Delta.to_relative` and `Delta.from_datetime` resolve seconds to months and
+days through `months` and `days` below. Integer seconds are looked up in
+`relative_cache`; in practice only a handful of distinct spans and dst
+offsets occur, so repeated normalizations become dictionary lookups.
+"""
+import threading
+
+from collections import OrderedDict, namedtuple
+
+from . import instrumentation
+from . import relative
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class _Stripe:
+    __slots__ = ('data', 'lock', 'hits', 'misses')
+
+    def __init__(self):
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+
+class LRUCache:
+    """
+    Cache of at most ``maxsize`` entries, evicting approximately the least
+    recently used.
+
+    Keys are spread over ``stripes`` independently locked stripes, so
+    threads rarely contend for a lock. Only the entry count is shared: when
+    the cache is full, an insert evicts the oldest entry of its own stripe,
+    or of the next stripe holding any other entry.
+    """
+
+    def __init__(self, maxsize=4096, name='lru', stripes=16):
+        if maxsize < 0:
+            raise ValueError('Parameter \'maxsize\' must be >= 0.')
+        if stripes < 1 or stripes & (stripes - 1):
+            raise ValueError('Parameter \'stripes\' must be a power of two.')
+        self.__name = name
+        self.__maxsize = maxsize
+        self.__size = 0
+        self.__size_lock = threading.Lock()
+        self.__mask = stripes - 1
+        self.__stripes = [_Stripe() for _ in range(stripes)]
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.__name} {self.info()}'
+
+    def __len__(self):
+        return self.__size
+
+    @property
+    def name(self):
+        return self.__name
+
+    def get(self, key, compute):
+        """Return the cached value of ``key``, calling ``compute()`` on a miss."""
+        index = hash(key) & self.__mask
+        stripe = self.__stripes[index]
+        with stripe.lock:
+            try:
+                value = stripe.data[key]
+            except KeyError:
+                stripe.misses += 1
+                hit = False
+            else:
+                stripe.data.move_to_end(key)
+                stripe.hits += 1
+                hit = True
+
+        if instrumentation.enabled:
+            instrumentation.count('cache_hits' if hit else 'cache_misses', self.__name)
+        if hit:
+            return value
+
+        # Computed outside the lock; concurrent misses may compute twice.
+        value = compute()
+        if not self.__maxsize:
+            return value
+        with stripe.lock:
+            added = key not in stripe.data
+            stripe.data[key] = value
+        if added:
+            with self.__size_lock:
+                self.__size += 1
+                full = self.__size > self.__maxsize
+            if full:
+                self.__evict(index, inserted=True)
+        return value
+
+    def resize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError('Parameter \'maxsize\' must be >= 0.')
+        self.__maxsize = maxsize
+        index = 0
+        while True:
+            with self.__size_lock:
+                if self.__size <= maxsize:
+                    return
+            index = self.__evict(index) + 1
+
+    def clear(self):
+        for stripe in self.__stripes:
+            with stripe.lock:
+                with self.__size_lock:
+                    self.__size -= len(stripe.data)
+                stripe.data.clear()
+                stripe.hits = 0
+                stripe.misses = 0
+
+    def info(self):
+        hits = misses = 0
+        for stripe in self.__stripes:
+            with stripe.lock:
+                hits += stripe.hits
+                misses += stripe.misses
+        return CacheInfo(hits, misses, self.__maxsize, self.__size)
+
+    def __evict(self, index, inserted=False):
+        """
+        Evict the oldest entry of stripe ``index``, or of the next stripe
+        that has one. With ``inserted``, the entry just added to stripe
+        ``index`` is kept.
+        """
+        for offset in range(len(self.__stripes)):
+            i = (index + offset) & self.__mask
+            stripe = self.__stripes[i]
+            with stripe.lock:
+                if len(stripe.data) > (inserted and not offset):
+                    stripe.data.popitem(last=False)
+                    with self.__size_lock:
+                        self.__size -= 1
+                    return i
+        return index
+
+
+relative_cache = LRUCache(4096, 'relative')
+
+
+def months(seconds):
+    """`relative.months`, memoized for integer seconds."""
+    if seconds % 1:
+        return relative.months(seconds)
+    seconds = int(seconds)
+    return relative_cache.get(('months', seconds), lambda: relative.months(seconds))
+
+
+def days(seconds):
+    """`relative.days`, memoized for integer seconds."""
+    if seconds % 1:
+        return relative.days(seconds)
+    seconds = int(seconds)
+    return relative_cache.get(('days', seconds), lambda: relative.days(seconds))
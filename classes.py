@@ -1,15 +1,19 @@
-from . import relative
+from . import cache
+from . import instrumentation
+from . import transitions
+from . import tzcache
+from .exceptions import MixedTimeUnitsWarning
 
 import warnings
 
 from datetime import datetime as dtdt
 from datetime import timedelta as dttd
-import pytz
 import time
 import math
+import sys
 from numbers import *
 from collections import namedtuple
-from decimal import Decimal
+from fractions import Fraction
 
 DEFAULT_TIMEZONE = 'UTC'
 DEFAULT_TIMEUNIT = 'day'
@@ -18,7 +22,12 @@ DEFAULT_TIMEUNIT = 'day'
 class Timestamp:
     """Timestamp"""
 
+    __slots__ = ('__value', '__val', '__sval')
+
     def __init__(self, *timestamp):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Timestamp')
+
         self.__val = None
         self.__sval = None
 
@@ -59,28 +68,87 @@ class Timestamp:
 
         timestamp = timestamp[0]
 
-        if not isinstance(timestamp, Real):
-            timestamp = Decimal(timestamp)
-
-        if timestamp >= 10 ** 11:
+        if isinstance(timestamp, str):
+            # Exact decimal seconds, picoseconds if the value is that large.
+            value = self.__parse(timestamp)
+            self.__value = value // 10 ** 12 if abs(value) >= 10 ** 23 else value
+        elif not isinstance(timestamp, Real):
+            # Decimal and other exact non-Real numbers.
+            self.__value = int(timestamp) if timestamp >= 10 ** 11 else int(timestamp * 10 ** 12)
+        elif timestamp >= 10 ** 11:
             # Assume picoseconds provided
             self.__value = int(timestamp)
-        elif isinstance(timestamp, Decimal):
-            self.__value = int(timestamp * 10 ** 12)
         else:
             # Float inaccuracies will cause rounding errors beyond μs.
             self.__value = round(timestamp * 10 ** 6) * 10 ** 6
 
+    @classmethod
+    def __from_value(cls, value):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Timestamp')
+
+        timestamp = cls.__new__(cls)
+        timestamp.__value = value
+        timestamp.__val = None
+        timestamp.__sval = None
+        return timestamp
+
+    @classmethod
+    def from_seconds(cls, seconds):
+        """Timestamp from seconds since the epoch. Floats are rounded to μs."""
+        if isinstance(seconds, float):
+            return cls.__from_value(round(seconds * 1e6) * 10 ** 6)
+        if isinstance(seconds, Integral):
+            # int() first: fixed-width integers such as numpy's would overflow.
+            return cls.__from_value(int(seconds) * 10 ** 12)
+        return cls.__from_value(int(seconds * 10 ** 12))
+
+    @classmethod
+    def from_ns(cls, nanoseconds):
+        """Timestamp from integer nanoseconds since the epoch."""
+        return cls.__from_value(int(nanoseconds) * 1000)
+
+    @classmethod
+    def from_ps(cls, picoseconds):
+        """Timestamp from integer picoseconds since the epoch."""
+        return cls.__from_value(int(picoseconds))
+
+    @classmethod
+    def from_parts(cls, seconds, picoseconds=0):
+        """
+        Timestamp from integer seconds plus a non-negative picosecond
+        offset, i.e. (seconds, picoseconds) as returned by `s` and `p`.
+        """
+        if not 0 <= picoseconds < 10 ** 12:
+            raise ValueError('Parameter \'picoseconds\' must be in [0, 10 ** 12)')
+        return cls.__from_value(int(seconds) * 10 ** 12 + int(picoseconds))
+
+    @classmethod
+    def now(cls):
+        return cls.__from_value(time.time_ns() * 1000)
+
+    @staticmethod
+    def __parse(timestamp):
+        text = timestamp.strip()
+        _sign = -1 if text.startswith('-') else 1
+        _s, _, _p = text.lstrip('+-').partition('.')
+        if not (_s or _p) or not (_s + _p).isdigit():
+            raise ValueError(f'Invalid timestamp \'{timestamp}\'.')
+        return _sign * (int(_s or 0) * 10 ** 12 + int(_p[:12].ljust(12, '0')))
+
     def __repr__(self):
         return f'{self.__class__.__name__}: {str(self)}'
 
     def __str__(self):
         if not self.__sval:
-            self.__sval = f'{int(self)}'
+            # Built locally and published in one assignment, so threads
+            # sharing this Timestamp never see a partial string.
+            sval = f'{int(self)}'
             if self.value[2]:
                 _p = f'{self.value[2]:>012d}'.rstrip('0')
                 _p = _p.ljust(math.ceil(len(_p) / 3) * 3, '0')
-                self.__sval += f'.{_p}'
+                sval += f'.{_p}'
+            self.__sval = sval
         return self.__sval
 
     def __int__(self):
@@ -89,10 +157,65 @@ class Timestamp:
     def __float__(self):
         return self.__value / 10 ** 12
 
+    def __hash__(self):
+        return _hash_ps(self.__value)
+
+    def __cmpvals(self, other):
+        if isinstance(other, Timestamp):
+            return self.__value, other._value
+        if isinstance(other, Real):
+            return self.__value, _seconds_ps(other)
+        return None
+
+    def __lt__(self, other):
+        vals = self.__cmpvals(other)
+        if vals is None:
+            return NotImplemented
+        return vals[0] < vals[1]
+
+    def __le__(self, other):
+        vals = self.__cmpvals(other)
+        if vals is None:
+            return NotImplemented
+        return vals[0] <= vals[1]
+
+    def __eq__(self, other):
+        vals = self.__cmpvals(other)
+        if vals is None:
+            return NotImplemented
+        return vals[0] == vals[1]
+
+    def __gt__(self, other):
+        vals = self.__cmpvals(other)
+        if vals is None:
+            return NotImplemented
+        return vals[0] > vals[1]
+
+    def __ge__(self, other):
+        vals = self.__cmpvals(other)
+        if vals is None:
+            return NotImplemented
+        return vals[0] >= vals[1]
+
     @property
     def _value(self):
         return self.__value
 
+    @property
+    def s(self):
+        """Whole seconds since the epoch, rounded down."""
+        return self.__value // 10 ** 12
+
+    @property
+    def p(self):
+        """Picoseconds past `s`, always in [0, 10 ** 12)."""
+        return self.__value % 10 ** 12
+
+    @property
+    def timestamp(self):
+        """Seconds since the epoch as float, like `datetime.timestamp()`."""
+        return self.__value / 10 ** 12
+
     @property
     def value(self):
         if not self.__val:
@@ -107,14 +230,29 @@ class Timezone:
     """Timezone"""
 
     def __init__(self, timezone=None):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Timezone')
+
         if not timezone:
             timezone = DEFAULT_TIMEZONE
         elif isinstance(timezone, self.__class__):
-            timezone = timezone.name
+            self.__pytz = timezone.__pytz
+            self.__name = timezone.name
+            return
+
+        if tzcache.lookup(timezone) is not None:
+            # pytz is only loaded once a tzinfo is needed.
+            self.__pytz = None
+            self.__name = timezone
+            return
 
+        import pytz
         self.__pytz = pytz.timezone(timezone)
         self.__name = self.__pytz.zone
 
+        if instrumentation.enabled:
+            instrumentation.count('tz_lookups', self.__name)
+
     def __repr__(self):
         return f'{self.__class__.__name__}: {str(self)}'
 
@@ -127,11 +265,26 @@ class Timezone:
 
     @property
     def pytz(self):
+        if self.__pytz is None:
+            import pytz
+            self.__pytz = pytz.timezone(self.__name)
+            if instrumentation.enabled:
+                instrumentation.count('tz_lookups', self.__name)
         return self.__pytz
 
+    @property
+    def transitions(self):
+        cached = tzcache.lookup(self.__name)
+        if cached is not None:
+            return cached
+        return transitions.table(self.pytz)
+
 
 class Unit:
     def __init__(self, unit=None, quantity=None):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Unit')
+
         if unit is None:
             unit = DEFAULT_TIMEUNIT
         if quantity is None:
@@ -257,7 +410,15 @@ class Unit:
 class Delta:
     """Delta"""
 
+    __Val = namedtuple('Val', ['m', 'd', 's', 'p', 'v'])
+    __Value = namedtuple('Value', ['years', 'months', 'days', 'hours', 'minutes', 'seconds',
+                                   'milliseconds', 'microseconds', 'nanoseconds', 'picoseconds'])
+    __Shorthand = namedtuple('Shorthand', ['Y', 'M', 'D', 'h', 'm', 's', 'ms', 'μs', 'ns', 'ps'])
+
     def __init__(self, *, months=0, days=0, seconds=0, picoseconds=0, **kwargs):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Delta')
+
         months += kwargs.get('millenniums', 0) * 12000
         months += kwargs.get('centuries', 0) * 1200
         months += kwargs.get('decades', 0) * 120
@@ -284,16 +445,20 @@ class Delta:
             days = int(days)
         self.__d = days
 
-        # Exact time units
-        self.__s = int(seconds + picoseconds // 10 ** 12)
-        self.__p = int((seconds * 10 ** 12 + picoseconds) % 10 ** 12)
+        # Exact time units, fractional seconds rounded to picoseconds
+        if seconds % 1:
+            whole = math.floor(seconds)
+            picoseconds += round((seconds - whole) * 10 ** 12)
+            seconds = whole
+        self.__s = int(seconds) + int(picoseconds) // 10 ** 12
+        self.__p = int(picoseconds) % 10 ** 12
 
         self.__v = (self.__m * 30.436875 + self.__d) * 86400 + self.__s + self.__p / 10 ** 12
 
-        self.__Val = namedtuple('Val', ['m', 'd', 's', 'p', 'v'])
-        self.__Value = namedtuple('Value', ['years', 'months', 'days', 'hours', 'minutes', 'seconds',
-                                            'milliseconds', 'microseconds', 'nanoseconds', 'picoseconds'])
-        self.__Shorthand = namedtuple('Shorthand', ['Y', 'M', 'D', 'h', 'm', 's', 'ms', 'μs', 'ns', 'ps'])
+        # Nominal length in picoseconds, a month being 1/12 of a mean
+        # Gregorian year of 365.2425 days, i.e. exactly 2629746 seconds.
+        self.__k = (self.__m * 2629746 + int(self.__d * 86400) + self.__s) * 10 ** 12 + self.__p
+        self.__g = bool(self.__m) * 4 + bool(self.__d) * 2 + bool(self.__s or self.__p)
 
     @classmethod
     def from_datetime(cls, timedelta: dttd, exact=None):
@@ -301,11 +466,11 @@ class Delta:
         if exact:
             return cls(seconds=secs)
 
-        months = relative.months(secs)
+        months = cache.months(secs)
         if months:
             return cls(months=months)
 
-        days = relative.days(secs)
+        days = cache.days(secs)
         if days:
             return cls(days=days)
 
@@ -317,26 +482,45 @@ class Delta:
 
     @classmethod
     def __make_comparable(cls, self, other):
-        if isinstance(other, dttd):
-            other = cls.from_datetime(other)
-        elif isinstance(other, (int, float)):
-            other = cls(seconds=other)
-
-        if isinstance(other, cls):
-            cmpval = (bool(self._val.m) * 32 +
-                      bool(self._val.d) * 16 +
-                      bool(self._val.s or self._val.p) * 8 +
-                      bool(other._val.m) * 4 +
-                      bool(other._val.d) * 2 +
-                      bool(other._val.s or self._val.p))
-            if cmpval not in (0, 1, 2, 4, 8, 9, 16, 18, 32, 36):
-                warnings.warn('Comparing exact and relative values, or relative '
-                              'values of different unit groups, is unreliable.')
-            return other
-        return None
+        if not isinstance(other, cls):
+            if isinstance(other, dttd):
+                other = cls.from_datetime(other)
+            elif isinstance(other, (int, float)):
+                other = cls(seconds=other)
+            else:
+                return None
+
+        cls.__check_groups(self.__g, other.__g)
+        return other
+
+    @staticmethod
+    def __check_groups(a, b):
+        # Unit groups (months, days, exact) present in either Delta.
+        if a and b and (a != b or a not in (1, 2, 4)):
+            warnings.warn('Comparing exact and relative values, or relative values of '
+                          'different unit groups, by nominal length; use Delta.compare '
+                          'with an anchor to compare them exactly.', MixedTimeUnitsWarning)
+
+    def __cmpvals(self, other):
+        if isinstance(other, Real):
+            # Plain numbers are exact seconds, compared without rounding.
+            self.__check_groups(self.__g, 1 if other else 0)
+            return self.__k, _seconds_ps(other)
+        other = self.__make_comparable(self, other)
+        if other is None:
+            return None
+        return self.__k, other.__k
+
+    @staticmethod
+    def __deprecate_inplace(method):
+        warnings.warn(f'Delta.{method}(inplace=True) is deprecated; Deltas are meant to be '
+                      f'immutable, use the returned Delta instead.', DeprecationWarning, stacklevel=3)
 
     def to_relative(self, inplace=False):
-        months = relative.months(self.seconds + self.__d * 86400)
+        if inplace:
+            self.__deprecate_inplace('to_relative')
+
+        months = cache.months(self.seconds + self.__d * 86400)
         if months:
             months += self.__m
             if inplace:
@@ -344,7 +528,7 @@ class Delta:
                 return
             return self.__class__(months=months)
 
-        days = relative.days(self.seconds)
+        days = cache.days(self.seconds)
         if days:
             days += self.__d
             if inplace:
@@ -357,9 +541,66 @@ class Delta:
 
     def to_exact(self, inplace=False):
         if inplace:
-            self.__init__(seconds=self.__v)
+            self.__deprecate_inplace('to_exact')
+            self.__init__(picoseconds=self.__k)
             return
-        return self.__class__(seconds=self.__v)
+        return self.__class__(picoseconds=self.__k)
+
+    def resolve(self, anchor, dst=None):
+        """
+        The exact Delta this Delta spans when added to Point ``anchor``.
+
+        Months and days are added to the wall-clock time in the anchor's
+        timezone, with days past the end of a month rolling over into the
+        next, and the exact part is added after. ``dst`` resolves wall times
+        made ambiguous or non-existent by a dst transition, as in
+        `Point.from_components`.
+        """
+        return self.__class__(picoseconds=self.key_at(anchor, dst))
+
+    def key_at(self, anchor, dst=None):
+        """Exact length in picoseconds when added to Point ``anchor``, see `resolve`."""
+        if not (self.__m or self.__d):
+            return self.__k
+        if dst not in transitions.DST_OPTIONS:
+            raise ValueError(f'Unknown dst option \'{dst}\'.')
+
+        value = anchor.timestamp._value
+        utc, picoseconds = divmod(value, 10 ** 12)
+        _transitions = anchor.timezone.transitions
+        days, seconds = divmod(utc + transitions.utcoffset(_transitions, utc), 86400)
+
+        date = dtdt.fromordinal(transitions.EPOCH_ORDINAL + days)
+        year, month = divmod(date.year * 12 + date.month - 1 + self.__m, 12)
+        ordinal = dtdt(year, month + 1, 1).toordinal() + date.day - 1
+        wall = (ordinal - transitions.EPOCH_ORDINAL) * 86400 + seconds + int(self.__d * 86400)
+
+        utc = transitions.localize(_transitions, wall, dst)
+        return (utc + self.__s) * 10 ** 12 + picoseconds + self.__p - value
+
+    def compare(self, other, anchor=None, dst=None):
+        """
+        -1, 0 or 1 as this Delta is shorter than, as long as or longer than
+        ``other``; exactly at Point ``anchor`` if given, see `resolve`,
+        otherwise by nominal length, see `key`.
+        """
+        delta = self.__make_comparable(self, other) if anchor is None else \
+            self.__comparable(other)
+        if delta is None:
+            raise TypeError(f'Cannot compare Delta with \'{type(other).__name__}\'.')
+        if anchor is None:
+            a, b = self.__k, delta.__k
+        else:
+            a, b = self.key_at(anchor, dst), delta.key_at(anchor, dst)
+        return (a > b) - (a < b)
+
+    @classmethod
+    def __comparable(cls, other):
+        if isinstance(other, dttd):
+            return cls.from_datetime(other, exact=True)
+        if isinstance(other, (int, float)):
+            return cls(seconds=other)
+        return other if isinstance(other, cls) else None
 
     def __repr__(self):
         v = self._val
@@ -463,7 +704,7 @@ class Delta:
         return self.exact or self.relative
 
     def __abs__(self):
-        if self._val.v < 0:
+        if self.__k < 0:
             return -self
         return self
 
@@ -498,7 +739,7 @@ class Delta:
             _m, _d, _s, _p, _ = (x / other for x in self._val)
             return self.__class__(months=_m, days=_d, seconds=_s, picoseconds=_p)
         else:
-            return self._val.v / other._val.v
+            return self.__k / other.__k
 
     def __floordiv__(self, other):
         if not isinstance(other, (float, int, self.__class__)):
@@ -507,31 +748,57 @@ class Delta:
             _m, _d, _s, _p, _ = (x // other for x in self._val)
             return self.__class__(months=_m, days=_d, seconds=_s, picoseconds=_p)
         else:
-            return self._val.v // other._val.v
+            return self.__k // other.__k
 
     def __lt__(self, other):
-        other = self.__make_comparable(self, other)
-        if other is None:
+        vals = self.__cmpvals(other)
+        if vals is None:
             raise NotImplementedError()
-        return self._val.v < other._val.v
+        return vals[0] < vals[1]
 
     def __eq__(self, other):
-        other = self.__make_comparable(self, other)
-        if other is None:
+        vals = self.__cmpvals(other)
+        if vals is None:
             raise NotImplementedError()
-        return self._val.v == other._val.v
+        return vals[0] == vals[1]
 
     def __gt__(self, other):
-        other = self.__make_comparable(self, other)
-        if other is None:
+        vals = self.__cmpvals(other)
+        if vals is None:
             raise NotImplementedError()
-        return self._val.v > other._val.v
+        return vals[0] > vals[1]
 
     def __le__(self, other):
-        return self < other or self == other
+        vals = self.__cmpvals(other)
+        if vals is None:
+            raise NotImplementedError()
+        return vals[0] <= vals[1]
 
     def __ge__(self, other):
-        return self > other or self == other
+        vals = self.__cmpvals(other)
+        if vals is None:
+            raise NotImplementedError()
+        return vals[0] >= vals[1]
+
+    def __hash__(self):
+        # Like the number of seconds it compares equal to.
+        return _hash_ps(self.__k)
+
+    @property
+    def key(self):
+        """
+        Exact integer sort key: the nominal length in picoseconds, counting
+        a day as 86400 seconds and a month as 2629746 seconds (a twelfth of
+        a mean Gregorian year). Deltas compare and hash by this key.
+        """
+        return self.__k
+
+    @property
+    def _picoseconds(self):
+        """Length in picoseconds; raises ValueError for relative Deltas."""
+        if self.__m or self.__d:
+            raise ValueError('Only exact Deltas are supported.')
+        return self.__k
 
     @property
     def _val(self):
@@ -539,11 +806,11 @@ class Delta:
 
     @property
     def relative(self):
-        return bool(self._val.m or self._val.d)
+        return bool(self.__m or self.__d)
 
     @property
     def exact(self):
-        return bool(self._val.s or self._val.p)
+        return bool(self.__s or self.__p)
 
     @property
     def value(self):
@@ -576,15 +843,19 @@ class Delta:
 
 
 class Point:
+    __Date = namedtuple('Date', ['year', 'month', 'day'])
+    __Time = namedtuple('Time', ['hour', 'minute', 'second'])
+
     def __init__(self, timestamp=None, timezone=None):
         """
 
         :param timestamp:
         :param timezone:
         """
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Point')
+
         self.__datetime = None
-        self.__Date = namedtuple('Date', ['year', 'month', 'day'])
-        self.__Time = namedtuple('Time', ['hour', 'minute', 'second'])
 
         if isinstance(timestamp, self.__class__):
             timezone = timezone or timestamp.timezone
@@ -615,16 +886,31 @@ class Point:
 
             timezone = timezone or timestamp.tzinfo.zone
 
-        self.__timestamp = Timestamp(timestamp)
+        if timestamp is None:
+            timestamp = Timestamp.now()
+        elif not isinstance(timestamp, Timestamp):
+            timestamp = Timestamp(timestamp)
+        self.__timestamp = timestamp
         self.__timezone = Timezone(timezone)
 
+    @classmethod
+    def _new(cls, timestamp, timezone):
+        """Point from a Timestamp and a Timezone, without validation."""
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Point')
+
+        point = cls.__new__(cls)
+        point.__datetime = None
+        point.__timestamp = timestamp
+        point.__timezone = timezone
+        return point
+
     @classmethod
     def from_datetime(cls, datetime: dtdt, dttimezone=None, timezone=None, dst=None):
 
         if not datetime.tzinfo:
-            if isinstance(dttimezone, (pytz.tzinfo.StaticTzInfo,
-                                       pytz.tzinfo.DstTzInfo,
-                                       pytz.UTC.__class__)):
+            if hasattr(dttimezone, 'localize'):
+                # pytz tzinfo
                 return cls(dttimezone.localize(datetime).timestamp(), timezone)
 
             components = datetime.timetuple()[:6] + (0, datetime.microsecond)
@@ -633,36 +919,65 @@ class Point:
 
     @classmethod
     def from_components(cls, components, timezone=None, dst=None):
-        while len(components) < 3:
-            components.append(1)
-        while len(components) < 10:
-            components.append(0)
+        """
+        Create a Point from wall-clock components in a timezone.
 
-        if (any((component < 1 for component in components[:3])) or
-                any((component < 0 for component in components[3:]))):
-            raise ValueError('Component values must be positive.')
+        :param components: (year, month, day, hour, minute, second,
+            millisecond, microsecond, nanosecond, picosecond), trailing
+            components may be omitted.
+        :param timezone:
+        :param dst: resolution of ambiguous or non-existent wall times;
+            None, 'earliest', 'latest', 'raise' or 'shift_forward'.
+        """
+        timezone = Timezone(timezone)
+        return cls(cls.__localize(components, timezone.transitions, dst), timezone)
 
-        _ts = Timestamp(components[5],
-                        components[6] * 10 ** 9 +
-                        components[7] * 10 ** 6 +
-                        components[8] * 1000 +
-                        components[9])
-        components[5], timestamp_p = _ts.s, _ts.p
+    @classmethod
+    def from_components_many(cls, components, timezone=None, dst=None):
+        """
+        Create Points from many wall-clock component sequences, localized
+        at once with `TimestampArray.from_components` when numpy is
+        installed, and one by one otherwise.
+
+        :param components: iterable of component sequences, see
+            `from_components`.
+        :param timezone:
+        :param dst: see `from_components`.
+        """
+        from . import arrays
 
         timezone = Timezone(timezone)
+        if arrays.numpy is None:
+            _transitions = timezone.transitions
+            return [cls(cls.__localize(c, _transitions, dst), timezone) for c in components]
 
-        datetime = timezone.pytz.localize(dtdt(*components[:6]))
+        timestamps = arrays.TimestampArray.from_components(components, timezone, dst)
+        return [cls._new(Timestamp.from_ps(s * 10 ** 12 + p), timezone)
+                for s, p in zip(timestamps.s.tolist(), timestamps.p.tolist())]
 
-        dst_up = dtdt.fromtimestamp(datetime.timestamp() + 4500, timezone.pytz).dst()
-        dst_dn = dtdt.fromtimestamp(datetime.timestamp() - 4500, timezone.pytz).dst()
+    @staticmethod
+    def __localize(components, _transitions, dst):
+        if dst not in transitions.DST_OPTIONS:
+            raise ValueError(f'Unknown dst option \'{dst}\'.')
 
-        if dst_up != dst_dn and dst is not None:
-            # TODO: DST handling
-            warnings.warn('Deterministic dst stuff isn\'t available yet.')
+        components = list(components)
+        if len(components) > 10:
+            raise TypeError(f'At most 10 components allowed ({len(components)} given)')
+        components += [1] * (3 - len(components))
+        components += [0] * (10 - len(components))
 
-        timestamp = Timestamp(datetime.timestamp(), timestamp_p)
+        if (any((component < 1 for component in components[:3])) or
+                any((component < 0 for component in components[3:]))):
+            raise ValueError('Component values must be positive.')
 
-        return cls(timestamp, timezone)
+        wall = transitions.wall_seconds(*components[:6])
+        utc = transitions.localize(_transitions, wall, dst)
+
+        return Timestamp.from_ps(utc * 10 ** 12 +
+                                 components[6] * 10 ** 9 +
+                                 components[7] * 10 ** 6 +
+                                 components[8] * 1000 +
+                                 components[9])
 
     @staticmethod
     def __roundparcheck(**kwargs):
@@ -777,6 +1092,9 @@ class Point:
             timestamp_f = components['second'] % 1
             components['second'] = int(components['second'])
 
+            if instrumentation.enabled:
+                instrumentation.count('local_conversions', 'localize')
+
             timestamp = self.timezone.pytz.localize(
                 dtdt(*components) + timedelta).timestamp() + timestamp_f
 
@@ -788,9 +1106,7 @@ class Point:
     def __sub__(self, other):
         if not isinstance(other, self.__class__):
             return self.__add__(-other)
-        delta = Delta(seconds=self.timestamp.timestamp - other.timestamp.timestamp)
-        delta.to_relative(inplace=True)
-        return delta
+        return Delta(seconds=self.timestamp.timestamp - other.timestamp.timestamp).to_relative()
 
     def __lt__(self, other):
         if isinstance(other, self.__class__):
@@ -806,6 +1122,8 @@ class Point:
             return self.timestamp == other.timestamp
         if isinstance(other, dtdt):
             return self.timestamp == other.timestamp()
+        if isinstance(other, Range):
+            return False
         return self.timestamp == other
 
     def __gt__(self, other):
@@ -814,7 +1132,8 @@ class Point:
         if isinstance(other, dtdt):
             return self.timestamp > other.timestamp()
         if isinstance(other, Range):
-            return self.timestamp > other.limits.max.timestamp
+            # Ranges are half-open, so their end already lies after them.
+            return self.timestamp >= other.limits.max.timestamp
         return self.timestamp > other
 
     def __le__(self, other):
@@ -823,6 +1142,9 @@ class Point:
     def __ge__(self, other):
         return self > other or self == other
 
+    def __hash__(self):
+        return hash(self.__timestamp)
+
     @property
     def timestamp(self):
         return self.__timestamp
@@ -833,6 +1155,11 @@ class Point:
 
     @property
     def datetime(self):
+        if instrumentation.enabled:
+            instrumentation.count('cache_hits' if self.__datetime else 'cache_misses', 'Point.datetime')
+            if self.__datetime is None:
+                instrumentation.count('local_conversions', 'fromtimestamp')
+
         if self.__datetime is None:
             ts = self.timestamp.timestamp
             tz = self.timezone.pytz
@@ -869,17 +1196,38 @@ class Point:
 
 
 class Range:
+    Limits = namedtuple('Limits', ['min', 'max'])
+    Piece = namedtuple('Piece', ['bucket', 'range'])
+
     def __init__(self, start, end, timezone=None):
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Range')
+
         _range = (Point(start, timezone), Point(end, timezone))
         if _range[0] >= _range[1]:
             raise ValueError('Parameter \'timestamp_start\' not smaller than \'timestamp_end\'.')
 
         self.__range = _range
-        self.__timezone = Timezone(timezone)
-        self.Limits = namedtuple('Limits', ['min', 'max'])
+        self.__timezone = Timezone(timezone) if timezone is not None else _range[0].timezone
+
+    @classmethod
+    def _new(cls, start, end, timezone):
+        """
+        Range from picosecond limits and a Timezone, without validation;
+        ``start`` must be smaller than ``end``.
+        """
+        if instrumentation.enabled:
+            instrumentation.count('constructions', 'Range')
+
+        timerange = cls.__new__(cls)
+        timerange.__range = (Point._new(Timestamp.from_ps(start), timezone),
+                             Point._new(Timestamp.from_ps(end), timezone))
+        timerange.__timezone = timezone
+        return timerange
 
     @classmethod
     def from_components(cls, components, timezone=None, dst=None):
+        components = list(components)
         start = Point.from_components(components, timezone, dst)
         while len(components) < 10:
             components.append(None)
@@ -898,8 +1246,200 @@ class Range:
 
     @classmethod
     def from_unit(cls, timepoint, unit, timezone=None):
-        pass
+        """
+        The calendar bucket of a Unit containing a point in time.
+
+        :param timepoint: Point, or anything Point accepts.
+        :param unit: Unit or unit name.
+        :param timezone: defaults to the Point's timezone.
+        """
+        from . import buckets
+
+        point = Point(timepoint, timezone)
+        par, n = buckets._unit(unit)
+        boundaries = buckets._boundaries(point.timestamp._value, par, n, point.timezone.transitions)
+        return cls(Timestamp.from_ps(next(boundaries)), Timestamp.from_ps(next(boundaries)), point.timezone)
+
+    def split(self, unit=None, timezone=None):
+        """
+        Cut the Range at the calendar boundaries of a Unit.
+
+        Yields a `Piece` of (bucket, range) for every bucket the Range spans,
+        with the first and last piece clipped to the Range. Boundaries are
+        generated incrementally, so days may be 23 or 25 hours long.
+
+        :param unit: Unit or unit name.
+        :param timezone: defaults to the timezone of the Range's start.
+        """
+        from . import buckets
+
+        timezone = Timezone(timezone or self.__range[0].timezone)
+        par, n = buckets._unit(unit)
+        yield from self.__split(par, n, timezone, {})
+
+    @classmethod
+    def split_many(cls, ranges, unit=None, timezone=None):
+        """
+        Split many Ranges, yielding (range, piece) pairs. Bucket Ranges are
+        shared between the pieces of all Ranges; only buckets that end after
+        the current Range's start are kept, so for Ranges sorted by start
+        memory stays bounded by the buckets of overlapping Ranges.
+
+        :param ranges: iterable of Ranges.
+        :param unit: Unit or unit name.
+        :param timezone: defaults to the timezone of each Range's start.
+        """
+        from . import buckets
+
+        par, n = buckets._unit(unit)
+        fixed = None if timezone is None else Timezone(timezone)
+        shared = {}
+        for timerange in ranges:
+            _timezone = fixed or timerange.limits.min.timezone
+            _buckets = shared.setdefault(_timezone.name, {})
+            start = timerange._bounds[0]
+            while _buckets:
+                # Buckets are inserted in order of start, thus of end.
+                oldest = next(iter(_buckets))
+                if _buckets[oldest]._bounds[1] > start:
+                    break
+                del _buckets[oldest]
+            for piece in timerange.__split(par, n, _timezone, _buckets):
+                yield timerange, piece
+
+    def __split(self, par, n, timezone, _buckets):
+        from . import buckets
+
+        start = self.__range[0].timestamp._value
+        end = self.__range[1].timestamp._value
+        boundaries = buckets._boundaries(start, par, n, timezone.transitions)
+
+        bucket_start = next(boundaries)
+        while bucket_start < end:
+            bucket_end = next(boundaries)
+            bucket = _buckets.get(bucket_start)
+            if bucket is None:
+                bucket = _buckets[bucket_start] = self._new(bucket_start, bucket_end, timezone)
+
+            if start <= bucket_start and bucket_end <= end:
+                piece = bucket
+            else:
+                piece = self._new(max(start, bucket_start), min(end, bucket_end), timezone)
+            yield self.Piece(bucket, piece)
+            bucket_start = bucket_end
 
     @property
     def limits(self):
         return self.Limits(*self.__range)
+
+    @property
+    def timezone(self):
+        return self.__timezone
+
+    @property
+    def _bounds(self):
+        """(start, end) in picoseconds since the epoch."""
+        return self.__range[0].timestamp._value, self.__range[1].timestamp._value
+
+    @property
+    def duration(self):
+        start, end = self._bounds
+        return Delta(picoseconds=end - start)
+
+    @staticmethod
+    def _instant(other):
+        """Picoseconds since the epoch of a point in time."""
+        if isinstance(other, Point):
+            return other.timestamp._value
+        if isinstance(other, Timestamp):
+            return other._value
+        if isinstance(other, dtdt):
+            return Timestamp.from_seconds(other.timestamp())._value
+        if isinstance(other, Real):
+            return Timestamp.from_seconds(other)._value
+        raise TypeError(f'Expected a Range, Point, Timestamp, datetime or number, '
+                        f'not \'{type(other).__name__}\'.')
+
+    def contains(self, other):
+        """
+        Whether a Range lies entirely within this Range, or a point in time
+        lies in [start, end).
+        """
+        start, end = self._bounds
+        if isinstance(other, Range):
+            other_start, other_end = other._bounds
+            return start <= other_start and other_end <= end
+        return start <= self._instant(other) < end
+
+    def overlaps(self, other):
+        """Whether this Range shares any time with a Range or point in time."""
+        if not isinstance(other, Range):
+            return self.contains(other)
+        start, end = self._bounds
+        other_start, other_end = other._bounds
+        return start < other_end and other_start < end
+
+    def intersection(self, other):
+        """The overlap with another Range in this Range's timezone, or None."""
+        start, end = self._bounds
+        other_start, other_end = other._bounds
+        start, end = max(start, other_start), min(end, other_end)
+        if start >= end:
+            return None
+        return self._new(start, end, self.__timezone)
+
+    def __contains__(self, item):
+        return self.contains(item)
+
+    def __hash__(self):
+        return hash(self._bounds)
+
+    def __eq__(self, other):
+        if not isinstance(other, Range):
+            return NotImplemented
+        return self._bounds == other._bounds
+
+    def __lt__(self, other):
+        if not isinstance(other, Range):
+            return NotImplemented
+        return self._bounds < other._bounds
+
+    def __le__(self, other):
+        if not isinstance(other, Range):
+            return NotImplemented
+        return self._bounds <= other._bounds
+
+    def __gt__(self, other):
+        if not isinstance(other, Range):
+            return NotImplemented
+        return self._bounds > other._bounds
+
+    def __ge__(self, other):
+        if not isinstance(other, Range):
+            return NotImplemented
+        return self._bounds >= other._bounds
+
+
+_HASH_MODULUS = sys.hash_info.modulus
+_HASH_INVERSE = pow(10 ** 12, -1, _HASH_MODULUS)
+
+
+def _seconds_ps(number):
+    """
+    Exact picoseconds of a real number of seconds: an int, a Fraction, or
+    the float itself if it is infinite or nan.
+    """
+    if isinstance(number, Integral):
+        return int(number) * 10 ** 12
+    if not isinstance(number, Rational):
+        number = float(number)
+        if not math.isfinite(number):
+            return number
+    return Fraction(number) * 10 ** 12
+
+
+def _hash_ps(value):
+    """Hash of picoseconds equal to that of the same number of seconds as int, float or Fraction."""
+    result = abs(value) * _HASH_INVERSE % _HASH_MODULUS
+    result = result if value >= 0 else -result
+    return -2 if result == -1 else result
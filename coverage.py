@@ -0,0 +1,118 @@
+"""
+Streaming coverage and gap analysis over Ranges sorted by start.
+
+All operators consume their input lazily and keep only the currently merged
+interval in memory.
+"""
+from .buckets import _boundaries, _unit
+from .classes import Delta, Range, Timestamp, Timezone
+
+
+def merge(ranges):
+    """Yield the union of possibly overlapping Ranges as disjoint Ranges."""
+    for start, end, timezone in _merged(ranges):
+        yield _range(start, end, timezone)
+
+
+def coverage(ranges):
+    """Yield ``(merged range, running total)`` with the total covered time as Delta."""
+    total = 0
+    for start, end, timezone in _merged(ranges):
+        total += end - start
+        yield _range(start, end, timezone), Delta(picoseconds=total)
+
+
+def gaps(ranges, minimum=None, start=None, end=None):
+    """
+    Yield the gaps between Ranges as Ranges.
+
+    :param ranges: iterable of Ranges sorted by start.
+    :param minimum: exact Delta; only gaps longer than this are yielded.
+    :param start: Point; also report the gap between it and the first Range.
+    :param end: Point; also report the gap between the last Range and it.
+    """
+    threshold = 0 if minimum is None else minimum._picoseconds
+    previous = None if start is None else start.timestamp._value
+    timezone = None if start is None else start.timezone
+
+    for _start, _end, timezone in _merged(ranges):
+        if previous is not None and _start - previous > threshold:
+            yield _range(previous, _start, timezone)
+        previous = _end if previous is None else max(previous, _end)
+
+    if end is not None and previous is not None and end.timestamp._value - previous > threshold:
+        yield _range(previous, end.timestamp._value, timezone)
+
+
+def coverage_by(ranges, unit=None, timezone=None, start=None, end=None):
+    """
+    Roll coverage up per calendar bucket of ``unit`` in ``timezone``.
+
+    Yields ``(bucket, covered, fraction)`` for every bucket from the one
+    containing ``start`` (or the first Range) up to the one containing
+    ``end`` (or the last Range), including buckets without any coverage.
+    ``covered`` is a Delta and ``fraction`` the covered share of the bucket.
+    """
+    par, n = _unit(unit)
+    timezone = Timezone(timezone)
+    _transitions = timezone.transitions
+    merged = _merged(ranges)
+
+    first = next(merged, None)
+    if first is None and start is None:
+        return
+
+    origin = start.timestamp._value if start is not None else first[0]
+    boundaries = _boundaries(origin, par, n, _transitions)
+    bucket_start = next(boundaries)
+    bucket_end = next(boundaries)
+    covered = 0
+
+    def flush():
+        bucket = Range(Timestamp.from_ps(bucket_start), Timestamp.from_ps(bucket_end), timezone)
+        return bucket, Delta(picoseconds=covered), covered / (bucket_end - bucket_start)
+
+    limit = end.timestamp._value if end is not None else None
+    interval = first
+    while interval is not None:
+        _start, _end, _ = interval
+        _start = max(_start, bucket_start)
+        if limit is not None:
+            _end = min(_end, limit)
+        while _start < _end:
+            if _start >= bucket_end:
+                yield flush()
+                bucket_start, bucket_end, covered = bucket_end, next(boundaries), 0
+                continue
+            piece_end = min(_end, bucket_end)
+            covered += piece_end - max(_start, bucket_start)
+            _start = piece_end
+        interval = next(merged, None)
+
+    yield flush()
+    while limit is not None and bucket_end < limit:
+        bucket_start, bucket_end, covered = bucket_end, next(boundaries), 0
+        yield flush()
+
+
+def _merged(ranges):
+    current = None
+    for item in ranges:
+        limits = item.limits
+        start, end = limits.min.timestamp._value, limits.max.timestamp._value
+        if current is None:
+            current = [start, end, limits.min.timezone]
+            continue
+        if start < current[0]:
+            raise ValueError('Ranges are not sorted by start.')
+        if start <= current[1]:
+            current[1] = max(current[1], end)
+            continue
+        yield tuple(current)
+        current = [start, end, limits.min.timezone]
+    if current is not None:
+        yield tuple(current)
+
+
+def _range(start, end, timezone):
+    return Range(Timestamp.from_ps(start), Timestamp.from_ps(end), timezone)
@@ -16,3 +16,8 @@ class MixedTimeUnitsWarning(TimerangeWarning):
 class AmbiguousDSTWarning(TimerangeWarning):
     """Warning raised when dst state cannot be determined."""
     pass
+
+
+class PrecisionLossWarning(TimerangeWarning):
+    """Warning raised when values are truncated to a coarser precision."""
+    pass
@@ -0,0 +1,163 @@
+"""
+Opt-in instrumentation for python-timerange.
+
+Counters are recorded at their call sites behind a single ``enabled`` check.
+Timings are collected by wrapping the hot functions only while
+instrumentation is enabled, so a disabled library runs its original code.
+"""
+import functools
+import threading
+
+from collections import namedtuple
+from contextlib import contextmanager
+from time import perf_counter
+
+enabled = False
+
+Stats = namedtuple('Stats', ['constructions', 'tz_lookups', 'local_conversions',
+                             'cache_hits', 'cache_misses', 'timings'])
+Timing = namedtuple('Timing', ['calls', 'seconds'])
+
+_COUNTERS = ('constructions', 'tz_lookups', 'local_conversions', 'cache_hits', 'cache_misses')
+
+# (module, owner, attribute) of every function timed while enabled.
+_TIMED = (('relative', None, 'days'),
+          ('relative', None, 'months'),
+          ('transitions', None, 'table'),
+          ('transitions', None, 'localize'),
+          ('classes', 'Delta', '__init__'),
+          ('classes', 'Delta', 'from_datetime'),
+          ('classes', 'Delta', 'to_relative'),
+          ('classes', 'Delta', 'to_exact'),
+          ('classes', 'Point', 'from_components'),
+          ('classes', 'Point', 'from_components_many'),
+          ('classes', 'Point', 'datetime'),
+          ('classes', 'Point', '__add__'),
+          ('classes', 'Point', '__sub__'))
+
+_counts = {counter: {} for counter in _COUNTERS}
+_timings = {}
+_originals = []
+_lock = threading.Lock()
+
+
+def count(counter, key, n=1):
+    """Increment ``counter[key]``. Call sites check `enabled` first."""
+    counts = _counts[counter]
+    with _lock:
+        counts[key] = counts.get(key, 0) + n
+
+
+def enable():
+    global enabled
+    if enabled:
+        return
+    _patch()
+    enabled = True
+
+
+def disable():
+    global enabled
+    if not enabled:
+        return
+    enabled = False
+    _unpatch()
+
+
+def reset():
+    with _lock:
+        for counts in _counts.values():
+            counts.clear()
+        _timings.clear()
+
+
+def stats():
+    """Snapshot of everything recorded since the last `reset`."""
+    with _lock:
+        return Stats(*(dict(_counts[counter]) for counter in _COUNTERS),
+                     {name: Timing(*timing) for name, timing in _timings.items()})
+
+
+class Measurement:
+    """Result holder of `measure`; `stats` is filled in on exit."""
+
+    def __init__(self):
+        self.stats = None
+
+
+@contextmanager
+def measure():
+    """
+    Enable instrumentation for the duration of the block and record the
+    difference in stats on the yielded `Measurement`.
+    """
+    was_enabled = enabled
+    enable()
+    before = stats()
+    measurement = Measurement()
+    try:
+        yield measurement
+    finally:
+        measurement.stats = _difference(stats(), before)
+        if not was_enabled:
+            disable()
+
+
+def _difference(after, before):
+    diff = []
+    for name, counts in zip(_COUNTERS, after):
+        previous = getattr(before, name)
+        diff.append({k: v - previous.get(k, 0) for k, v in counts.items()
+                     if v != previous.get(k, 0)})
+    timings = {}
+    for name, timing in after.timings.items():
+        previous = before.timings.get(name, Timing(0, 0.0))
+        if timing.calls != previous.calls:
+            timings[name] = Timing(timing.calls - previous.calls, timing.seconds - previous.seconds)
+    return Stats(*diff, timings)
+
+
+def _timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            with _lock:
+                timing = _timings.setdefault(name, [0, 0.0])
+                timing[0] += 1
+                timing[1] += elapsed
+    return wrapper
+
+
+def _wrap(name, attr):
+    if isinstance(attr, classmethod):
+        return classmethod(_timed(name, attr.__func__))
+    if isinstance(attr, staticmethod):
+        return staticmethod(_timed(name, attr.__func__))
+    if isinstance(attr, property):
+        return property(_timed(name, attr.fget), attr.fset, attr.fdel, attr.__doc__)
+    return _timed(name, attr)
+
+
+def _patch():
+    from . import classes, relative, transitions
+    modules = {'classes': classes, 'relative': relative, 'transitions': transitions}
+
+    for module, owner, attribute in _TIMED:
+        target = modules[module]
+        name = f'{module}.{attribute}'
+        if owner:
+            target = getattr(target, owner)
+            name = f'{owner}.{attribute}'
+        original = vars(target)[attribute]
+        _originals.append((target, attribute, original))
+        setattr(target, attribute, _wrap(name, original))
+
+
+def _unpatch():
+    while _originals:
+        target, attribute, original = _originals.pop()
+        setattr(target, attribute, original)
@@ -0,0 +1,77 @@
+"""
+Sort-merge interval join between two collections of Ranges.
+"""
+import heapq
+
+from .classes import Delta
+
+PREDICATES = ('overlaps', 'contains', 'within')
+
+
+def overlap_join(left, right, predicate='overlaps', tolerance=None, duration=False, presorted=False):
+    """
+    Yield pairs ``(l, r)`` of Ranges from ``left`` and ``right`` that match.
+
+    Both inputs are sorted by start once, or streamed as-is when
+    ``presorted`` is set, and swept together while keeping only the Ranges
+    that can still match, which takes O((n + m) log(n + m) + k).
+
+    :param left: iterable of Ranges.
+    :param right: iterable of Ranges.
+    :param predicate: 'overlaps' for any overlap, 'contains' for ``r`` lying
+        within ``l``, 'within' for ``l`` lying within ``r``.
+    :param tolerance: exact Delta; for 'overlaps', Ranges also match when
+        the gap between them is shorter than ``tolerance``. For 'contains'
+        and 'within', the outer Range is widened by ``tolerance`` on both
+        sides before checking that it holds the inner one.
+    :param duration: yield ``(l, r, overlap)`` with the overlap as Delta,
+        zero for Ranges matched across a gap.
+    :param presorted: inputs are already ordered by start; they are then
+        consumed lazily and ordering is verified on the fly.
+    """
+    if predicate not in PREDICATES:
+        raise ValueError(f'Unknown predicate \'{predicate}\'.')
+
+    tol = 0 if tolerance is None else tolerance._picoseconds
+
+    events = heapq.merge(_keyed(left, 0, presorted), _keyed(right, 1, presorted))
+    active = ([], [])
+
+    for start, side, seq, end, item in events:
+        other = active[1 - side]
+        while other and other[0][0] + tol <= start:
+            heapq.heappop(other)
+
+        for o_end, _, o_start, o_item in other:
+            if side:
+                l_start, l_end, l_item, r_start, r_end, r_item = o_start, o_end, o_item, start, end, item
+            else:
+                l_start, l_end, l_item, r_start, r_end, r_item = start, end, item, o_start, o_end, o_item
+
+            if predicate == 'contains' and not (l_start - tol <= r_start and r_end <= l_end + tol):
+                continue
+            if predicate == 'within' and not (r_start - tol <= l_start and l_end <= r_end + tol):
+                continue
+
+            if duration:
+                overlap = max(0, min(l_end, r_end) - max(l_start, r_start))
+                yield l_item, r_item, Delta(picoseconds=overlap)
+            else:
+                yield l_item, r_item
+
+        heapq.heappush(active[side], (end, seq, start, item))
+
+
+def _keyed(ranges, side, presorted):
+    keyed = ((item.limits.min.timestamp._value, side, seq, item.limits.max.timestamp._value, item)
+             for seq, item in enumerate(ranges))
+    if not presorted:
+        yield from sorted(keyed)
+        return
+
+    previous = None
+    for key in keyed:
+        if previous is not None and key[0] < previous:
+            raise ValueError('Ranges are not sorted by start.')
+        previous = key[0]
+        yield key
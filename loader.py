@@ -0,0 +1,486 @@
+"""
+Streaming bulk loading of start/end timestamp columns from CSV and JSON
+lines files.
+
+Files are read in large binary blocks. Each block is split into columns
+with a few bytes operations, and whole columns are parsed with numpy into
+`TimestampArray` chunks of at most ``chunksize`` rows, so memory stays
+bounded by the block and chunk size. `points`, `ranges` and `load` turn
+chunks into objects, or feed them into a container such as `SortedRanges`
+or a set.
+
+Column formats are 's', 'ms', 'us' and 'ns' for epoch numbers (decimal
+fractions are exact down to picoseconds), 'iso' for ISO 8601 strings, or
+'auto' to detect the format from the first block. ISO strings may end in
+'Z' or a ±HH:MM offset; strings without one are wall-clock times in the
+given timezone. Requires numpy.
+"""
+from . import arrays
+from . import transitions
+from .arrays import TimestampArray
+from .classes import Point, Range, Timestamp, Timezone
+
+import re
+
+from collections import namedtuple
+
+FORMATS = ('auto', 's', 'ms', 'us', 'ns', 'iso')
+
+# Picoseconds per unit of epoch number formats.
+SCALES = {'s': 10 ** 12, 'ms': 10 ** 9, 'us': 10 ** 6, 'ns': 1000}
+
+Chunk = namedtuple('Chunk', ['start', 'end', 'timezone'])
+
+
+def read_csv(source, start, end=None, formats=None, timezone=None, dst=None, chunksize=2 ** 20,
+             delimiter=',', header=True, buffer=2 ** 22):
+    """
+    Yield `Chunk` s of (start, end, timezone) read from a CSV file; ``end``
+    is None without an end column.
+
+    :param source: path or binary file object.
+    :param start: name, or index without ``header``, of the start column.
+    :param end: name or index of the end column, if any.
+    :param formats: format of both columns, or a dict of formats by column.
+    :param timezone: Timezone of the Points and Ranges built from chunks,
+        and of ISO strings without offset.
+    :param dst: resolution of such strings that are ambiguous or
+        non-existent due to a dst transition, as in `Point.from_components`.
+    :param chunksize: maximum number of rows per chunk.
+    :param delimiter: single character separating fields.
+    :param buffer: number of bytes read at once.
+    """
+    if len(delimiter) != 1:
+        raise ValueError('Parameter \'delimiter\' must be a single character.')
+    delimiter = delimiter.encode()
+    columns = [column for column in (start, end) if column is not None]
+
+    def blocks(file):
+        indices = None
+        for block in _blocks(file, buffer):
+            if indices is None:
+                names = None
+                if header:
+                    line, _, block = block.partition(b'\n')
+                    names = [name.strip().strip(b'"').decode() for name in line.split(delimiter)]
+                indices = [_index(names, column) for column in columns]
+            if block:
+                yield _csv_columns(block, indices, delimiter)
+
+    yield from _read(source, blocks, columns, formats, timezone, dst, chunksize)
+
+
+def read_jsonl(source, start, end=None, formats=None, timezone=None, dst=None, chunksize=2 ** 20,
+               buffer=2 ** 22):
+    """
+    Yield `Chunk` s of (start, end, timezone) read from a JSON lines file of
+    objects; ``end`` is None without an end key.
+
+    :param source: path or binary file object.
+    :param start: top-level key of the start values.
+    :param end: top-level key of the end values, if any.
+    :param formats: format of both keys, or a dict of formats by key.
+    :param timezone: Timezone of the Points and Ranges built from chunks,
+        and of ISO strings without offset.
+    :param dst: resolution of such strings that are ambiguous or
+        non-existent due to a dst transition, as in `Point.from_components`.
+    :param chunksize: maximum number of rows per chunk.
+    :param buffer: number of bytes read at once.
+    """
+    keys = [key for key in (start, end) if key is not None]
+    patterns = [re.compile(rb'"' + re.escape(key.encode()) + rb'"\s*:\s*(?:"([^"]*)"|([^\s,}]+))')
+                for key in keys]
+
+    def blocks(file):
+        for block in _blocks(file, buffer):
+            yield _jsonl_columns(block, keys, patterns)
+
+    yield from _read(source, blocks, keys, formats, timezone, dst, chunksize)
+
+
+def points(chunk):
+    """Yield the start Points of a chunk."""
+    timezone = chunk.timezone
+    for _s, _p in zip(chunk.start.s.tolist(), chunk.start.p.tolist()):
+        yield Point._new(Timestamp.from_ps(_s * 10 ** 12 + _p), timezone)
+
+
+def ranges(chunk):
+    """Yield the Ranges of a chunk with an end column."""
+    if chunk.end is None:
+        raise ValueError('Chunk has no end column.')
+    timezone = chunk.timezone
+    for start_s, start_p, end_s, end_p in zip(chunk.start.s.tolist(), chunk.start.p.tolist(),
+                                              chunk.end.s.tolist(), chunk.end.p.tolist()):
+        yield Range._new(start_s * 10 ** 12 + start_p, end_s * 10 ** 12 + end_p, timezone)
+
+
+def load(chunks, into):
+    """
+    Feed the Ranges, or the Points for chunks without an end column, of
+    all chunks into a container with an ``update`` or ``add`` method, one
+    chunk at a time. Returns the container.
+    """
+    update = getattr(into, 'update', None)
+    for chunk in chunks:
+        items = points(chunk) if chunk.end is None else ranges(chunk)
+        if update is not None:
+            update(items)
+        else:
+            for item in items:
+                into.add(item)
+    return into
+
+
+def _read(source, blocks, columns, formats, timezone, dst, chunksize):
+    if chunksize < 1:
+        raise ValueError('Parameter \'chunksize\' must be >= 1.')
+    if not isinstance(formats, dict):
+        formats = dict.fromkeys(columns, formats or 'auto')
+    formats = [formats.get(column, 'auto') for column in columns]
+    for fmt in formats:
+        if fmt not in FORMATS:
+            raise ValueError(f'Unknown format \'{fmt}\'.')
+    timezone = Timezone(timezone)
+    if dst not in transitions.DST_OPTIONS:
+        raise ValueError(f'Unknown dst option \'{dst}\'.')
+
+    def parsed(file):
+        for values in blocks(file):
+            if not len(values[0][1]):
+                continue
+            for i, fmt in enumerate(formats):
+                if fmt == 'auto':
+                    formats[i] = _detect(values[i])
+            parts = [_parse(column, fmt, timezone, dst) for column, fmt in zip(values, formats)]
+            if len(parts) == 2:
+                start, end = parts
+                if ((end.s < start.s) | ((end.s == start.s) & (end.p <= start.p))).any():
+                    raise ValueError('End values must be later than start values.')
+            yield parts
+
+    if hasattr(source, 'read'):
+        yield from _rechunk(parsed(source), chunksize, timezone)
+        return
+    with open(source, 'rb') as file:
+        yield from _rechunk(parsed(file), chunksize, timezone)
+
+
+def _blocks(file, buffer):
+    """Yield blocks of complete, non-empty, newline terminated lines."""
+    rest = b''
+    while True:
+        block = file.read(buffer)
+        if not block:
+            break
+        block = rest + block
+        cut = block.rfind(b'\n') + 1
+        block, rest = block[:cut], block[cut:]
+        if block:
+            yield _clean(block)
+    if rest.strip():
+        yield _clean(rest + b'\n')
+
+
+def _clean(block):
+    if b'\r' in block:
+        block = block.replace(b'\r\n', b'\n')
+    if block.startswith(b'\n') or b'\n\n' in block:
+        block = b''.join(line + b'\n' for line in block.split(b'\n') if line.strip())
+    return block
+
+
+def _index(names, column):
+    if isinstance(column, int):
+        return column
+    if names is None:
+        raise ValueError(f'Column \'{column}\' must be an index without a header.')
+    try:
+        return names.index(column)
+    except ValueError:
+        raise ValueError(f'Column \'{column}\' not in header.') from None
+
+
+def _csv_columns(block, indices, delimiter):
+    """Fields of the columns at ``indices``, as (byte matrix, lengths) pairs."""
+    np = arrays._numpy()
+    buf = np.frombuffer(block, np.uint8)
+    ends = np.flatnonzero((buf == delimiter[0]) | (buf == 10))
+    rows = block.count(b'\n')
+    width = len(ends) // rows
+
+    if b'"' in block or width * rows != len(ends) or (buf[ends[width - 1::width]] != 10).any():
+        # Quoted fields or ragged rows: fall back to the csv module.
+        import csv
+        lines = block.decode().splitlines()
+        rows = list(csv.reader(lines, delimiter=delimiter.decode()))
+        return [_matrix(np.array([row[index].encode() for row in rows], dtype=bytes))
+                for index in indices]
+
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    return [_fields(buf, starts[index::width], ends[index::width]) for index in indices]
+
+
+def _jsonl_columns(block, keys, patterns):
+    np = arrays._numpy()
+    buf = np.frombuffer(block, np.uint8)
+    newlines = np.flatnonzero(buf == 10)
+    rows = len(newlines)
+    columns = []
+    # Nested objects may hold the keys as well; only flat lines are matched.
+    if block.count(b'{') == rows:
+        for key, pattern in zip(keys, patterns):
+            # Exactly one occurrence of the key on every line.
+            found = _find(buf, b'"%s"' % key.encode())
+            if len(found) != rows or (np.searchsorted(newlines, found) != np.arange(rows)).any():
+                break
+            values = [quoted or bare for quoted, bare in pattern.findall(block)]
+            if len(values) != rows:
+                break
+            columns.append(_matrix(np.array(values, dtype=bytes)))
+        else:
+            return columns
+
+    # Nested objects, missing or repeated keys: decode line by line.
+    import json
+    objects = [json.loads(line) for line in block.splitlines()]
+    try:
+        return [_matrix(np.array([str(obj[key]).encode() for obj in objects], dtype=bytes))
+                for key in keys]
+    except KeyError as error:
+        raise ValueError(f'Key {error} missing.') from None
+
+
+def _find(buf, needle):
+    """Start positions of ``needle`` in the byte array ``buf``."""
+    np = arrays._numpy()
+    n = len(buf) - len(needle) + 1
+    if n <= 0:
+        return np.zeros(0, np.int64)
+    hits = buf[:n] == needle[0]
+    for i, byte in enumerate(needle[1:], 1):
+        hits &= buf[i:i + n] == byte
+    return np.flatnonzero(hits)
+
+
+def _fields(buf, starts, ends):
+    """Byte matrix, zero padded, and lengths of the fields buf[starts:ends]."""
+    np = arrays._numpy()
+    while True:
+        lead = (starts < ends) & (buf[starts] == 32)
+        if not lead.any():
+            break
+        starts = starts + lead
+    while True:
+        trail = (starts < ends) & (buf[ends - 1] == 32)
+        if not trail.any():
+            break
+        ends = ends - trail
+
+    lengths = ends - starts
+    width = int(lengths.max()) if len(lengths) else 0
+    if not width:
+        return np.zeros((len(lengths), 0), np.uint8), lengths
+    # Rows of a sliding window view are copied whole, then cut at their lengths.
+    padded = np.concatenate([buf, np.zeros(width, np.uint8)])
+    matrix = np.lib.stride_tricks.sliding_window_view(padded, width)[starts]
+    matrix[np.arange(width) >= lengths[:, None]] = 0
+    return matrix, lengths
+
+
+def _matrix(values):
+    """Byte matrix and lengths of an array of bytes strings."""
+    np = arrays._numpy()
+    values = np.char.strip(values)
+    width = max(values.dtype.itemsize, 1)
+    matrix = np.frombuffer(values.astype(f'S{width}').tobytes(), np.uint8).reshape(len(values), width)
+    return matrix, np.char.str_len(values).astype(np.int64)
+
+
+def _digits(matrix, first, stop, last):
+    """
+    Integers of the decimal digits in columns [first, stop) of every row,
+    ``last`` being the column of the unit digit; None if one is no digit.
+    """
+    np = arrays._numpy()
+    powers = 10 ** np.arange(19, dtype=np.int64)
+    total = np.zeros(len(matrix), np.int64)
+    if not len(matrix):
+        return total
+    for column in range(int(first.min()), min(int(stop.max()), matrix.shape[1])):
+        used = (first <= column) & (column < stop)
+        digits = matrix[:, column] - np.uint8(48)
+        if (digits[used] > 9).any():
+            return None
+        total += np.where(used, digits * powers[np.clip(last - column, 0, 18)], 0)
+    return total
+
+
+def _detect(column):
+    """Format of a column, judged from its first values."""
+    np = arrays._numpy()
+    matrix, lengths = column[0][:1000], column[1][:1000]
+    if not matrix.shape[1]:
+        return 'iso'
+    first = (np.isin(matrix[:, 0], (ord('+'), ord('-')))).astype(np.int64)
+    dot = matrix == ord('.')
+    stop = np.where(dot.any(axis=1), dot.argmax(axis=1), lengths)
+    if _digits(matrix, first, stop, stop - 1) is None or \
+            _digits(matrix, stop + 1, lengths, lengths - 1) is None or (stop == first).any():
+        return 'iso'
+    largest = int((stop - first).max()) if len(stop) else 0
+    for fmt, digits in (('s', 11), ('ms', 14), ('us', 17)):
+        if largest <= digits:
+            return fmt
+    return 'ns'
+
+
+def _parse(column, fmt, timezone, dst):
+    """TimestampArray of a column in format ``fmt``."""
+    if fmt == 'iso':
+        return _parse_iso(*column, timezone, dst)
+    np = arrays._numpy()
+    matrix, lengths = column
+    scale = SCALES[fmt]
+    per_second = 10 ** 12 // scale
+
+    sign = matrix[:, 0] if matrix.shape[1] else np.zeros(len(lengths), np.uint8)
+    negative = sign == ord('-')
+    first = (negative | (sign == ord('+'))).astype(np.int64)
+    dot = matrix == ord('.')
+    has_dot = dot.any(axis=1)
+    stop = np.where(has_dot, dot.argmax(axis=1), lengths)
+    # Whole seconds and the rest, e.g. the last 9 integer digits of 'ns',
+    # are read separately so neither needs more than 18 digits.
+    split = np.maximum(stop - (len(str(per_second)) - 1), first)
+    seconds = _digits(matrix, first, split, split - 1)
+    rest = _digits(matrix, split, stop, stop - 1)
+    if seconds is None or rest is None or (stop == first).any() or (split - first > 18).any():
+        raise ValueError(f'Values are not all epoch numbers in format \'{fmt}\'.')
+    picoseconds = rest * scale
+    if has_dot.any():
+        # Up to 12 fractional digits of seconds, i.e. picoseconds.
+        fraction = _digits(matrix, stop + 1, np.minimum(lengths, stop + 13), stop + 12)
+        if fraction is None:
+            raise ValueError(f'Values are not all epoch numbers in format \'{fmt}\'.')
+        picoseconds += fraction // per_second
+
+    if negative.any():
+        # -(s + p) = (-s - 1) + (10 ** 12 - p) for p > 0.
+        carry = negative & (picoseconds > 0)
+        seconds = np.where(negative, -seconds - carry, seconds)
+        picoseconds = np.where(carry, 10 ** 12 - picoseconds, picoseconds)
+    return TimestampArray(seconds, picoseconds)
+
+
+def _parse_iso(matrix, lengths, timezone, dst):
+    np = arrays._numpy()
+    n = len(lengths)
+    if not n:
+        return TimestampArray(np.zeros(0, np.int64))
+    if matrix.shape[1] < 32:
+        matrix = np.pad(matrix, ((0, 0), (0, 32 - matrix.shape[1])))
+    rows = np.arange(n)
+    digits = matrix[:, :19] - np.uint8(48)
+
+    def char(position):
+        # Negative positions of short values wrap into the zero padding.
+        return matrix[rows, position]
+
+    def number(*positions):
+        value = digits[:, positions[0]].astype(np.int64)
+        for position in positions[1:]:
+            value = value * 10 + digits[:, position]
+        return value
+
+    # 'Z' and ±HH:MM suffixes.
+    zulu = char(lengths - 1) == ord('Z')
+    sign = char(lengths - 6)
+    offset = (lengths > 16) & ((sign == ord('+')) | (sign == ord('-'))) & (char(lengths - 3) == ord(':'))
+    hours, minutes = (char(lengths - 5) - 48) * 10 + char(lengths - 4) - 48, \
+        (char(lengths - 2) - 48) * 10 + char(lengths - 1) - 48
+    offsets = np.where(offset, (hours.astype(np.int64) * 60 + minutes) * 60, 0)
+    offsets = np.where(sign == ord('-'), -offsets, offsets)
+    core = np.where(zulu, lengths - 1, np.where(offset, lengths - 6, lengths))
+
+    # YYYY-MM-DD[( |T)HH:MM[:SS[.fraction]]] is decoded arithmetically.
+    timed = core > 10
+    with_seconds = core > 16
+    fractional = core > 19
+    plain = ((core == 10) | (core == 16) | (core >= 19)) & \
+        (matrix[:, 4] == ord('-')) & (matrix[:, 7] == ord('-')) & \
+        (~timed | (((matrix[:, 10] == ord('T')) | (matrix[:, 10] == ord(' '))) & (matrix[:, 13] == ord(':')))) & \
+        (~with_seconds | (matrix[:, 16] == ord(':'))) & \
+        (~fractional | ((matrix[:, 19] == ord('.')) & (core > 20))) & \
+        ~(digits[:, [0, 1, 2, 3, 5, 6, 8, 9]] > 9).any(axis=1) & \
+        ~(timed & (digits[:, [11, 12, 14, 15]] > 9).any(axis=1)) & \
+        ~(with_seconds & (digits[:, [17, 18]] > 9).any(axis=1))
+
+    if plain.all():
+        year, month, day = number(0, 1, 2, 3), number(5, 6), number(8, 9)
+        hour = np.where(timed, number(11, 12), 0)
+        minute = np.where(timed, number(14, 15), 0)
+        second = np.where(with_seconds, number(17, 18), 0)
+        plain = (month >= 1) & (month <= 12) & (day >= 1) & (day <= arrays._month_days(year, month)) & \
+            (hour < 24) & (minute < 60) & (second < 60)
+
+    if plain.all():
+        seconds = arrays._civil_days(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+        picoseconds = None
+        if fractional.any():
+            point = np.full(n, 19)
+            picoseconds = _digits(matrix, point + 1, np.minimum(core, point + 13), point + 12)
+            if picoseconds is None:
+                raise ValueError('Values are not all ISO 8601 strings.')
+    else:
+        # Other layouts are left to numpy.
+        stripped = np.where(np.arange(matrix.shape[1]) < core[:, None], matrix, 0).astype(np.uint8)
+        parts = np.char.partition(stripped.view(f'S{matrix.shape[1]}').ravel(), b'.')
+        try:
+            values = parts[:, 0].astype('datetime64[s]')
+        except ValueError:
+            raise ValueError('Values are not all ISO 8601 strings.') from None
+        if np.isnat(values).any():
+            raise ValueError('Empty and NaT values are not supported.')
+        seconds = values.astype(np.int64)
+        picoseconds = None
+        if (parts[:, 1] != b'').any():
+            picoseconds = np.char.ljust(parts[:, 2], 12, b'0').astype('S12').astype(np.int64)
+
+    naive = ~(zulu | offset)
+    if naive.any() and timezone.name != 'UTC':
+        seconds[naive] = TimestampArray.from_wall(seconds[naive], timezone=timezone, dst=dst).s
+    return TimestampArray(seconds - offsets, picoseconds)
+
+
+def _rechunk(blocks, chunksize, timezone):
+    """Regroup parsed blocks into chunks of ``chunksize`` rows."""
+    pending, count = [], 0
+    for parts in blocks:
+        pending.append(parts)
+        count += len(parts[0])
+        if count < chunksize:
+            continue
+        columns = [_concatenate([block[i] for block in pending]) for i in range(len(parts))]
+        done = count - count % chunksize
+        for lo in range(0, done, chunksize):
+            yield _chunk([column[lo:lo + chunksize] for column in columns], timezone)
+        count -= done
+        pending = [[column[done:] for column in columns]] if count else []
+    if count:
+        yield _chunk([_concatenate([block[i] for block in pending]) for i in range(len(pending[0]))],
+                     timezone)
+
+
+def _concatenate(columns):
+    if len(columns) == 1:
+        return columns[0]
+    np = arrays._numpy()
+    return TimestampArray(np.concatenate([column.s for column in columns]),
+                          np.concatenate([column.p for column in columns]))
+
+
+def _chunk(columns, timezone):
+    return Chunk(columns[0], columns[1] if len(columns) > 1 else None, timezone)
@@ -0,0 +1,291 @@
+"""
+Hierarchical timing-wheel scheduler for callbacks at Points and Range limits.
+
+Time is divided into ticks of an exact `Delta`. Each of the ``levels`` wheels
+has ``slots`` slots; level ``n`` covers ``slots ** (n + 1)`` ticks and is
+cascaded into the level below whenever that one completes a rotation.
+Inserting and cancelling a callback are O(1).
+"""
+import asyncio
+import inspect
+
+from .classes import Delta, Point, Range, Timestamp
+
+
+class ManualClock:
+    """Clock for deterministic, offline use of a `Scheduler`."""
+
+    def __init__(self, start=None):
+        self.__now = _timestamp(start) if start is not None else Timestamp.from_ps(0)
+
+    def __call__(self):
+        return self.__now
+
+    def set(self, when):
+        when = _timestamp(when)
+        if when < self.__now:
+            raise ValueError('ManualClock cannot move backwards.')
+        self.__now = when
+
+    def advance(self, delta):
+        self.set(Timestamp.from_ps(self.__now._value + _picoseconds(delta)))
+
+
+class Handle:
+    """Scheduled callback, returned by `Scheduler.call_at`."""
+
+    __slots__ = ('when', 'expiry', 'callback', 'args', 'cancelled', '_slot', '_scheduler')
+
+    def __init__(self, scheduler, when, expiry, callback, args):
+        self._scheduler = scheduler
+        self.when = when
+        self.expiry = expiry
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._slot = None
+
+    def __repr__(self):
+        state = ' cancelled' if self.cancelled else ''
+        return f'{self.__class__.__name__}: {self.when}{state}'
+
+    def cancel(self):
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self._slot is not None:
+            del self._slot[self]
+            self._slot = None
+            self._scheduler._discard()
+
+
+class RangeHandle:
+    """Pair of handles at the start and end of a Range."""
+
+    __slots__ = ('start', 'end')
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+    def cancel(self):
+        for handle in (self.start, self.end):
+            if handle is not None:
+                handle.cancel()
+
+    @property
+    def cancelled(self):
+        return all(handle.cancelled for handle in (self.start, self.end) if handle is not None)
+
+
+class Scheduler:
+    """
+    Timing-wheel scheduler.
+
+    :param tick: exact `Delta` resolution of the wheel.
+    :param start: Point or Timestamp of tick 0; defaults to the clock's time.
+    :param slots: slots per wheel, a power of two.
+    :param levels: number of wheels.
+    :param clock: callable returning the current Timestamp; defaults to
+        `Timestamp.now`. Pass a `ManualClock` for deterministic use.
+    """
+
+    def __init__(self, tick=None, start=None, slots=256, levels=4, clock=None):
+        if tick is None:
+            tick = Delta(milliseconds=100)
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError('Parameter \'slots\' must be a power of two.')
+        if levels < 1:
+            raise ValueError('Parameter \'levels\' must be at least 1.')
+
+        self.__tick = _picoseconds(tick)
+        if self.__tick <= 0:
+            raise ValueError('Parameter \'tick\' must be positive.')
+
+        self.__clock = clock or Timestamp.now
+        self.__origin = _timestamp(start if start is not None else self.__clock())._value
+        self.__bits = slots.bit_length() - 1
+        self.__mask = slots - 1
+        self.__wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self.__overflow = {}
+        self.__due = {}
+        self.__current = 0
+        self.__count = 0
+        self.__loop = None
+
+    def __len__(self):
+        return self.__count
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.__count} pending at {self.now}'
+
+    @property
+    def now(self):
+        """Timestamp of the current tick."""
+        return Timestamp.from_ps(self.__origin + self.__current * self.__tick)
+
+    @property
+    def tick(self):
+        return Delta(picoseconds=self.__tick)
+
+    def call_at(self, when, callback, *args):
+        """
+        Schedule ``callback(*args)`` at a Point or Timestamp. It fires on
+        the first tick at or after ``when``.
+        """
+        when = _timestamp(when)
+        expiry = -((self.__origin - when._value) // self.__tick)
+        handle = Handle(self, when, expiry, callback, args)
+        self.__insert(handle)
+        self.__count += 1
+        return handle
+
+    def call_later(self, delta, callback, *args):
+        """Schedule ``callback(*args)`` at `now` plus an exact Delta."""
+        return self.call_at(Timestamp.from_ps(self.now._value + _picoseconds(delta)), callback, *args)
+
+    def call_range(self, timerange, on_start=None, on_end=None, *args):
+        """
+        Schedule ``on_start(timerange, *args)`` at the start and
+        ``on_end(timerange, *args)`` at the end of a Range.
+        """
+        if not isinstance(timerange, Range):
+            raise TypeError('Parameter \'timerange\' must be a Range.')
+        limits = timerange.limits
+        start = end = None
+        if on_start is not None:
+            start = self.call_at(limits.min, on_start, timerange, *args)
+        if on_end is not None:
+            end = self.call_at(limits.max, on_end, timerange, *args)
+        return RangeHandle(start, end)
+
+    def advance_to(self, when):
+        """
+        Advance to the last tick at or before a Point or Timestamp, firing
+        everything due up to and including that tick. Callbacks scheduled
+        between two ticks are due on the later one, so they fire once time
+        reaches it rather than at ``when`` itself.
+        """
+        target = (_timestamp(when)._value - self.__origin) // self.__tick
+        fired = self.__fire(self.__due)
+        while self.__current < target:
+            if not self.__count:
+                self.__current = target
+                break
+            self.__current += 1
+            self.__cascade()
+            fired += self.__fire(self.__wheels[0][self.__current & self.__mask])
+            fired += self.__fire(self.__due)
+        return fired
+
+    def advance(self, delta):
+        return self.advance_to(Timestamp.from_ps(self.now._value + _picoseconds(delta)))
+
+    def run_pending(self):
+        """Fire everything due according to the clock."""
+        return self.advance_to(self.__clock())
+
+    async def run(self, until=None):
+        """
+        Follow the clock, firing callbacks once per tick, until ``until`` (a
+        Point or Timestamp) is reached or the task is cancelled. Callbacks
+        returning awaitables are scheduled as tasks; exceptions are passed to
+        the loop's exception handler.
+        """
+        until = None if until is None else _timestamp(until)
+        self.__loop = asyncio.get_running_loop()
+        try:
+            while True:
+                now = self.__clock()
+                self.advance_to(now if until is None or now < until else until)
+                if until is not None and now >= until:
+                    return
+                remainder = self.__tick - (now._value - self.__origin) % self.__tick
+                await asyncio.sleep(remainder / 10 ** 12)
+        finally:
+            self.__loop = None
+
+    def _discard(self):
+        self.__count -= 1
+
+    def __insert(self, handle):
+        delta = handle.expiry - self.__current
+        if delta <= 0:
+            slot = self.__due
+        else:
+            slot = self.__overflow
+            for level, wheel in enumerate(self.__wheels):
+                if delta < 1 << (self.__bits * (level + 1)):
+                    slot = wheel[(handle.expiry >> (self.__bits * level)) & self.__mask]
+                    break
+        slot[handle] = None
+        handle._slot = slot
+
+    def __cascade(self):
+        current = self.__current
+        for level in range(1, len(self.__wheels)):
+            if current & ((1 << (self.__bits * level)) - 1):
+                return
+            slot = self.__wheels[level][(current >> (self.__bits * level)) & self.__mask]
+            self.__reinsert(slot)
+        self.__reinsert(self.__overflow)
+
+    def __reinsert(self, slot):
+        handles = list(slot)
+        slot.clear()
+        for handle in handles:
+            self.__insert(handle)
+
+    def __fire(self, slot):
+        if not slot:
+            return 0
+        handles = list(slot)
+        slot.clear()
+        for handle in handles:
+            handle._slot = None
+            self.__count -= 1
+        fired = 0
+        error = None
+        for handle in handles:
+            # An earlier callback of the batch may have cancelled it.
+            if handle.cancelled:
+                continue
+            fired += 1
+            try:
+                self.__call(handle)
+            except Exception as exc:
+                # Fire the rest of the batch, then raise the first error.
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
+        return fired
+
+    def __call(self, handle):
+        if self.__loop is None:
+            handle.callback(*handle.args)
+            return
+        try:
+            result = handle.callback(*handle.args)
+            if inspect.isawaitable(result):
+                self.__loop.create_task(result)
+        except Exception as exc:
+            self.__loop.call_exception_handler({
+                'message': 'Exception in scheduled callback',
+                'exception': exc,
+                'handle': handle,
+            })
+
+
+def _timestamp(when):
+    if isinstance(when, Point):
+        return when.timestamp
+    if isinstance(when, Timestamp):
+        return when
+    return Timestamp(when)
+
+
+def _picoseconds(delta):
+    if isinstance(delta, Delta):
+        return delta._picoseconds
+    return Timestamp.from_seconds(delta)._value
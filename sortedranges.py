@@ -0,0 +1,216 @@
+"""
+Mutable collection of Ranges kept ordered by (start, end).
+
+Ranges are stored in a list of sorted chunks of bounded size, so inserting,
+removing and finding neighbours bisect twice and shift at most one chunk,
+which keeps them logarithmic in practice even under constant churn. Every
+chunk also tracks the latest end among its Ranges, so overlap queries skip
+chunks that end before the queried time.
+"""
+from bisect import bisect_left, bisect_right
+
+from .classes import Range
+
+_LOAD = 512
+
+
+class SortedRanges:
+    """
+    Ranges ordered by start, then end. Equal Ranges may occur repeatedly.
+
+    Besides Ranges, `before`, `after` and `overlapping` accept points in
+    time: anything `Range.contains` accepts.
+    """
+
+    def __init__(self, ranges=()):
+        self.__keys = []
+        self.__items = []
+        self.__maxes = []
+        self.__ends = []
+        self.__len = 0
+        self.update(ranges)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.__len} range(s)'
+
+    def __len__(self):
+        return self.__len
+
+    def __iter__(self):
+        for items in self.__items:
+            yield from items
+
+    def __reversed__(self):
+        for items in reversed(self.__items):
+            yield from reversed(items)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.__len
+        if not 0 <= index < self.__len:
+            raise IndexError('SortedRanges index out of range.')
+        for items in self.__items:
+            if index < len(items):
+                return items[index]
+            index -= len(items)
+
+    def __contains__(self, timerange):
+        return self.__find(timerange) is not None
+
+    def add(self, timerange):
+        """Insert a Range."""
+        key = timerange._bounds
+        if not self.__keys:
+            self.__keys.append([key])
+            self.__items.append([timerange])
+            self.__maxes.append(key)
+            self.__ends.append(key[1])
+            self.__len = 1
+            return
+
+        i = bisect_left(self.__maxes, key)
+        if i == len(self.__maxes):
+            i -= 1
+        keys = self.__keys[i]
+        j = bisect_right(keys, key)
+        keys.insert(j, key)
+        self.__items[i].insert(j, timerange)
+        self.__maxes[i] = keys[-1]
+        if key[1] > self.__ends[i]:
+            self.__ends[i] = key[1]
+        self.__len += 1
+
+        if len(keys) > 2 * _LOAD:
+            self.__split(i)
+
+    def update(self, ranges):
+        """Insert many Ranges, sorting them at once when that is cheaper."""
+        ranges = list(ranges)
+        if len(ranges) < self.__len // 8 + 1:
+            for timerange in ranges:
+                self.add(timerange)
+            return
+
+        pairs = sorted(((timerange._bounds, timerange) for timerange in ranges),
+                       key=lambda pair: pair[0])
+        if self.__len:
+            pairs = list(zip(self.__iter_keys(), self)) + pairs
+            pairs.sort(key=lambda pair: pair[0])
+
+        self.__keys = [[key for key, _ in pairs[i:i + _LOAD]] for i in range(0, len(pairs), _LOAD)]
+        self.__items = [[item for _, item in pairs[i:i + _LOAD]] for i in range(0, len(pairs), _LOAD)]
+        self.__maxes = [keys[-1] for keys in self.__keys]
+        self.__ends = [max(key[1] for key in keys) for keys in self.__keys]
+        self.__len = len(pairs)
+
+    def remove(self, timerange):
+        """Remove a Range equal to ``timerange``; raises ValueError if there is none."""
+        found = self.__find(timerange)
+        if found is None:
+            raise ValueError(f'Range {tuple(timerange.limits)} is not in {self.__class__.__name__}.')
+        self.__delete(*found)
+
+    def discard(self, timerange):
+        """Remove a Range equal to ``timerange`` if there is one."""
+        found = self.__find(timerange)
+        if found is not None:
+            self.__delete(*found)
+
+    def clear(self):
+        self.__keys, self.__items, self.__maxes, self.__ends = [], [], [], []
+        self.__len = 0
+
+    def before(self, other):
+        """
+        The last Range ordered before a Range, or starting before a point in
+        time; None if there is none.
+        """
+        key = self.__key(other)
+        i = bisect_left(self.__maxes, key)
+        if i < len(self.__maxes):
+            j = bisect_left(self.__keys[i], key)
+            if j:
+                return self.__items[i][j - 1]
+        return self.__items[i - 1][-1] if i else None
+
+    def after(self, other):
+        """
+        The first Range ordered after a Range, or starting at or after a
+        point in time; None if there is none.
+        """
+        key = self.__key(other)
+        i = bisect_right(self.__maxes, key)
+        if i == len(self.__maxes):
+            return None
+        return self.__items[i][bisect_right(self.__keys[i], key)]
+
+    def overlapping(self, other):
+        """Yield, in order, the Ranges overlapping a Range or containing a point in time."""
+        if isinstance(other, Range):
+            start, end = other._bounds
+        else:
+            start = Range._instant(other)
+            end = start + 1
+
+        for keys, items, chunk_end in zip(self.__keys, self.__items, self.__ends):
+            if keys[0][0] >= end:
+                return
+            if chunk_end <= start:
+                continue
+            for key, item in zip(keys, items):
+                if key[0] >= end:
+                    return
+                if key[1] > start:
+                    yield item
+
+    def __iter_keys(self):
+        for keys in self.__keys:
+            yield from keys
+
+    @staticmethod
+    def __key(other):
+        if isinstance(other, Range):
+            return other._bounds
+        instant = Range._instant(other)
+        return instant, instant
+
+    def __find(self, timerange):
+        key = timerange._bounds
+        i = bisect_left(self.__maxes, key)
+        while i < len(self.__maxes):
+            keys = self.__keys[i]
+            j = bisect_left(keys, key)
+            if j < len(keys):
+                if keys[j] != key:
+                    return None
+                # Prefer the very same object among equal Ranges.
+                items = self.__items[i]
+                k = j
+                while k < len(keys) and keys[k] == key:
+                    if items[k] is timerange:
+                        return i, k
+                    k += 1
+                if k < len(keys) or i + 1 == len(self.__maxes) or self.__keys[i + 1][0] != key:
+                    return i, j
+            i += 1
+        return None
+
+    def __delete(self, i, j):
+        keys, items = self.__keys[i], self.__items[i]
+        key = keys.pop(j)
+        del items[j]
+        self.__len -= 1
+
+        if not keys:
+            del self.__keys[i], self.__items[i], self.__maxes[i], self.__ends[i]
+            return
+        self.__maxes[i] = keys[-1]
+        if key[1] == self.__ends[i]:
+            self.__ends[i] = max(k[1] for k in keys)
+
+    def __split(self, i):
+        keys, items = self.__keys[i], self.__items[i]
+        self.__keys[i:i + 1] = [keys[:_LOAD], keys[_LOAD:]]
+        self.__items[i:i + 1] = [items[:_LOAD], items[_LOAD:]]
+        self.__maxes[i:i + 1] = [keys[_LOAD - 1], keys[-1]]
+        self.__ends[i:i + 1] = [max(k[1] for k in keys[:_LOAD]), max(k[1] for k in keys[_LOAD:])]
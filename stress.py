@@ -0,0 +1,96 @@
+"""
+Thread-pool stress run over shared Points, Deltas and Timestamps.
+
+Worker threads repeatedly format, convert and subtract the same shared
+instances and exercise the shared caches. Every thread's results are
+compared with a single-threaded reference run, and the wall time per
+thread count shows how the work scales. Near-linear scaling needs a
+free-threaded CPython build; under the GIL the run checks correctness
+only.
+
+Usage::
+
+    python -m <package>.stress [--iterations N] [THREADS ...]
+"""
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from . import cache
+from .classes import Delta, Point, Timestamp
+
+ZONES = ('UTC', 'Europe/Amsterdam', 'America/New_York', 'Asia/Kolkata', 'Australia/Sydney')
+
+
+def _shared():
+    points = [Point.from_components((2024, month, 1 + month, month, 30), zone)
+              for month in range(1, 13) for zone in ZONES]
+    timestamps = [Timestamp.from_parts(1700000000 + i * 7919, i * 123456789) for i in range(64)]
+    deltas = [Delta(seconds=i * 86400 + i) for i in range(64)]
+    return points, timestamps, deltas
+
+
+def _work(shared, iterations):
+    points, timestamps, deltas = shared
+    results = []
+    for i in range(iterations):
+        point = points[i % len(points)]
+        other = points[(i * 7) % len(points)]
+        timestamp = timestamps[i % len(timestamps)]
+        delta = deltas[i % len(deltas)]
+        results.append((
+            str(timestamp),
+            timestamp.value,
+            point.datetime.isoformat(),
+            str(point - other),
+            str(delta.to_relative()),
+            str(delta.to_relative().to_exact()),
+            cache.months(i % 4096 * 3600),
+        ))
+    return results
+
+
+def run(threads=(1, 2, 4, 8), iterations=2000):
+    """
+    Run ``iterations`` work items in each of ``threads`` worker threads,
+    for every thread count given. Returns ``{threads: seconds}``; raises
+    AssertionError if any thread's results differ from the reference.
+    """
+    expected = _work(_shared(), iterations)
+    timings = {}
+    for n in threads:
+        # Fresh instances and caches, so lazy fields are populated concurrently.
+        cache.relative_cache.clear()
+        shared = _shared()
+        with ThreadPoolExecutor(n) as executor:
+            start = time.perf_counter()
+            futures = [executor.submit(_work, shared, iterations) for _ in range(n)]
+            results = [future.result() for future in futures]
+            timings[n] = time.perf_counter() - start
+        for result in results:
+            if result != expected:
+                raise AssertionError(f'Results differ from single-threaded run with {n} threads.')
+    return timings
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Thread-pool stress run.')
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('threads', type=int, nargs='*', default=[1, 2, 4, 8])
+    args = parser.parse_args(argv)
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f'Python {sys.version.split()[0]}, GIL {"enabled" if gil else "disabled"}')
+
+    timings = run(args.threads, args.iterations)
+    base = timings[args.threads[0]] / args.threads[0]
+    for n, seconds in timings.items():
+        print(f'{n:>3} threads: {seconds * 1000:8.1f} ms, '
+              f'speedup {base * n / seconds:5.2f} (ideal {n})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+from . import instrumentation
+from .exceptions import AmbiguousDSTWarning
+
+import warnings
+
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import datetime as dtdt
+from datetime import timedelta as dttd
+
+EPOCH = dtdt(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# Largest absolute utc offset any zone has ever used is below a day.
+MAX_OFFSET = 86400
+
+DST_OPTIONS = (None, 'earliest', 'latest', 'raise', 'shift_forward')
+
+Transitions = namedtuple('Transitions', ['times', 'offsets', 'dsts'])
+
+_tables = {}
+
+
+def table(tzinfo):
+    """Transition table of a pytz timezone, in integer utc seconds.
+
+    Period ``i`` starts at ``times[i]`` and uses utc offset ``offsets[i]``
+    until ``times[i + 1]``. Tables are built once per zone and cached.
+    """
+    try:
+        transitions = _tables[tzinfo.zone]
+    except KeyError:
+        if instrumentation.enabled:
+            instrumentation.count('cache_misses', 'transitions')
+    else:
+        if instrumentation.enabled:
+            instrumentation.count('cache_hits', 'transitions')
+        return transitions
+
+    second = dttd(seconds=1)
+    utc_times = getattr(tzinfo, '_utc_transition_times', None)
+    if utc_times:
+        times = [(t - EPOCH) // second for t in utc_times]
+        offsets = [info[0] // second for info in tzinfo._transition_info]
+        dsts = [info[1] // second for info in tzinfo._transition_info]
+    else:
+        times = [(dtdt.min - EPOCH) // second]
+        offsets = [tzinfo.utcoffset(None) // second]
+        dsts = [0]
+
+    # Concurrent builders may race; all of them return the first table stored.
+    return _tables.setdefault(tzinfo.zone, Transitions(times, offsets, dsts))
+
+
+def wall_seconds(year, month, day, hour=0, minute=0, second=0):
+    """Wall-clock time as seconds since the epoch, as if it were utc."""
+    ordinal = dtdt(year, month, day, hour, minute, second).toordinal()
+    return (ordinal - EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 + second
+
+
+def localize(transitions, wall, dst=None):
+    """Resolve wall-clock seconds to utc seconds.
+
+    Ambiguous (repeated) and non-existent (skipped) wall times are resolved
+    according to ``dst``:
+
+    - ``'earliest'``: the earlier of both candidate instants.
+    - ``'latest'``: the later of both candidate instants.
+    - ``'raise'``: raise a ``ValueError``.
+    - ``'shift_forward'``: non-existent times move to the first instant after
+      the transition; ambiguous times resolve as ``'latest'``.
+    - ``None``: warn with ``AmbiguousDSTWarning`` and resolve as ``'latest'``,
+      which matches pytz' default of ``is_dst=False``.
+    """
+    if instrumentation.enabled:
+        instrumentation.count('local_conversions', 'localize')
+
+    times, offsets = transitions.times, transitions.offsets
+    lo = max(bisect_right(times, wall - MAX_OFFSET) - 1, 0)
+    hi = bisect_right(times, wall + MAX_OFFSET)
+    last = len(times) - 1
+
+    candidates = []
+    for i in range(lo, hi):
+        utc = wall - offsets[i]
+        if times[i] <= utc and (i == last or utc < times[i + 1]):
+            candidates.append(utc)
+
+    if len(candidates) == 1:
+        return candidates[0]
+
+    if candidates:
+        earliest, latest, shifted = min(candidates), max(candidates), max(candidates)
+        state = 'ambiguous'
+    else:
+        for i in range(max(lo, 1), hi):
+            if times[i] + offsets[i - 1] <= wall < times[i] + offsets[i]:
+                break
+        else:
+            raise ValueError('Unable to resolve wall time against transition table.')
+        earliest, latest, shifted = wall - offsets[i], wall - offsets[i - 1], times[i]
+        state = 'non-existent'
+
+    if dst is None:
+        warnings.warn(f'Wall time is {state} due to a dst transition; '
+                      f'resolving to the latest candidate.', AmbiguousDSTWarning)
+        return latest
+    if dst == 'earliest':
+        return earliest
+    if dst == 'latest':
+        return latest
+    if dst == 'shift_forward':
+        return shifted
+    raise ValueError(f'Wall time is {state} due to a dst transition.')
+
+
+def utcoffset(transitions, utc):
+    """Utc offset in seconds at utc seconds ``utc``."""
+    return transitions.offsets[max(bisect_right(transitions.times, utc) - 1, 0)]
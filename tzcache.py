@@ -0,0 +1,259 @@
+"""
+Compiled cache of timezone transition tables.
+
+`build` compiles the transition tables of all, or selected, zones of the
+installed pytz into one compact binary file. `Timezone` looks zones up in
+that file, which is memory-mapped lazily on first use, and only imports
+and parses pytz for zones missing from it or when a pytz tzinfo is
+actually needed.
+
+The file is read from ``$TIMERANGE_TZCACHE`` when set (an empty value
+disables the cache), otherwise from ``timerange/tzcache.bin`` in the user
+cache directory. It reflects the pytz data it was built from, and is
+ignored once the size or modification time of the installed pytz's
+``zoneinfo/tzdata.zi`` differs; rebuild it after upgrading pytz, with
+`tzcachetool`.
+"""
+from . import transitions
+
+import mmap
+import os
+import struct
+import sys
+import threading
+
+from array import array
+
+MAGIC = b'TRTZ'
+VERSION = 2
+
+_HEADER = struct.Struct('<4sHBI')
+_NAME = struct.Struct('<H')
+_ENTRY = struct.Struct('<QI')
+
+_UNLOADED = object()
+_cache = _UNLOADED
+_lock = threading.Lock()
+
+
+class TzCache:
+    """Memory-mapped transition tables, decoded per zone on first lookup."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__path = path
+        self.__tables = {}
+
+        magic, version, little, count = _HEADER.unpack_from(self.__mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'\'{path}\' is not a timezone cache of version {VERSION}.')
+        if little != (sys.byteorder == 'little'):
+            raise ValueError(f'\'{path}\' was built on a machine of different byte order.')
+
+        position = _HEADER.size
+        (length,) = _NAME.unpack_from(self.__mmap, position)
+        position += _NAME.size
+        self.__source = self.__mmap[position:position + length].decode()
+        position += length
+        (length,) = _NAME.unpack_from(self.__mmap, position)
+        position += _NAME.size
+        self.__fingerprint = self.__mmap[position:position + length].decode()
+        position += length
+
+        self.__index = {}
+        for _ in range(count):
+            (length,) = _NAME.unpack_from(self.__mmap, position)
+            position += _NAME.size
+            name = self.__mmap[position:position + length].decode()
+            position += length
+            self.__index[name] = _ENTRY.unpack_from(self.__mmap, position)
+            position += _ENTRY.size
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.__path} ({len(self)} zones, pytz {self.__source})'
+
+    def __len__(self):
+        return len(self.__index)
+
+    def __contains__(self, name):
+        return name in self.__index
+
+    @property
+    def source(self):
+        """pytz version the cache was built from."""
+        return self.__source
+
+    @property
+    def fingerprint(self):
+        """Size and modification time of the tz data of the pytz it was built from."""
+        return self.__fingerprint
+
+    @property
+    def zones(self):
+        return list(self.__index)
+
+    def table(self, name):
+        """Transition table of a zone, or None if it is not cached."""
+        try:
+            return self.__tables[name]
+        except KeyError:
+            pass
+        try:
+            offset, n = self.__index[name]
+        except KeyError:
+            return None
+
+        view = memoryview(self.__mmap)
+        times = view[offset:offset + 8 * n].cast('q')
+        offset += 8 * n
+        offsets = view[offset:offset + 4 * n].cast('i')
+        offset += 4 * n
+        dsts = view[offset:offset + 4 * n].cast('i')
+        return self.__tables.setdefault(name, transitions.Transitions(times, offsets, dsts))
+
+
+def default_path():
+    path = os.environ.get('TIMERANGE_TZCACHE')
+    if path is not None:
+        return path or None
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'timerange', 'tzcache.bin')
+
+
+def load(path=None):
+    """Use the cache at ``path`` (default: `default_path`) from now on."""
+    global _cache
+    _cache = TzCache(path or default_path())
+    return _cache
+
+
+def unload():
+    """Stop using a compiled cache; zones are parsed from pytz again."""
+    global _cache
+    _cache = None
+
+
+def get():
+    """The cache in use, loading it on first call; None if there is none."""
+    global _cache
+    with _lock:
+        if _cache is _UNLOADED:
+            path = default_path()
+            try:
+                _cache = TzCache(path) if path and os.path.exists(path) else None
+            except (OSError, ValueError, struct.error):
+                _cache = None
+            if _cache is not None and _cache.fingerprint != _fingerprint():
+                _cache = None
+    return _cache
+
+
+def _fingerprint():
+    """
+    Size and modification time of the installed pytz's tz data, found
+    without importing pytz; None if it is not found.
+    """
+    import importlib.util
+
+    spec = importlib.util.find_spec('pytz')
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    try:
+        stat = os.stat(os.path.join(spec.submodule_search_locations[0], 'zoneinfo', 'tzdata.zi'))
+    except OSError:
+        return None
+    return f'{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def lookup(name):
+    """Cached transition table of zone ``name``, or None."""
+    cache = _cache if _cache is not _UNLOADED else get()
+    if cache is None:
+        return None
+    return cache.table(name)
+
+
+def build(path=None, zones=None):
+    """
+    Compile the transition tables of ``zones`` (default: all pytz zones)
+    into a cache file at ``path`` (default: `default_path`).
+    """
+    import pytz
+
+    path = path or default_path()
+    if not path:
+        raise ValueError('No cache path given and $TIMERANGE_TZCACHE is empty.')
+    zones = list(zones) if zones is not None else list(pytz.all_timezones)
+
+    tables = [(zone, transitions.table(pytz.timezone(zone))) for zone in zones]
+    source = pytz.__version__.encode()
+    fingerprint = (_fingerprint() or '').encode()
+    names = [zone.encode() for zone, _ in tables]
+
+    header = _HEADER.pack(MAGIC, VERSION, sys.byteorder == 'little', len(tables))
+    header += _NAME.pack(len(source)) + source
+    header += _NAME.pack(len(fingerprint)) + fingerprint
+    index_size = sum(_NAME.size + len(name) + _ENTRY.size for name in names)
+    offset = len(header) + index_size
+    offset += -offset % 8
+
+    index, data = [], []
+    for name, (zone, table) in zip(names, tables):
+        n = len(table.times)
+        index.append(_NAME.pack(len(name)) + name + _ENTRY.pack(offset, n))
+        data.append(array('q', table.times).tobytes() +
+                    array('i', table.offsets).tobytes() +
+                    array('i', table.dsts).tobytes())
+        offset += 16 * n
+
+    head = header + b''.join(index)
+    head += b'\0' * (-len(head) % 8)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(head)
+        file.write(b''.join(data))
+    os.replace(temporary, path)
+    return path
+
+
+def benchmark(path=None, runs=5):
+    """
+    Compare startup with and without the compiled cache, in fresh
+    interpreters: cumulative import time of the package according to
+    ``python -X importtime``, and the time to create a first Point in a
+    non-UTC zone once the package is imported.
+    """
+    import subprocess
+
+    package = __package__
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    first_point = (f'import time; from {package}.classes import Point; '
+                   f't = time.perf_counter(); '
+                   f'Point.from_components((2024, 6, 1), "Europe/Amsterdam"); '
+                   f'print(time.perf_counter() - t)')
+
+    def run(cache_path, *args):
+        env = dict(os.environ, TIMERANGE_TZCACHE=cache_path or '',
+                   PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+        return subprocess.run([sys.executable, *args], env=env, capture_output=True,
+                              text=True, check=True)
+
+    def import_time(cache_path):
+        stderr = run(cache_path, '-X', 'importtime', '-c', f'import {package}').stderr
+        for line in stderr.splitlines():
+            parts = [part.strip() for part in line.split('|')]
+            if len(parts) == 3 and parts[2] == package:
+                return int(parts[1]) / 10 ** 6
+        return None
+
+    path = path or default_path()
+    results = {}
+    for label, cache_path in (('pytz', None), ('tzcache', path)):
+        imports = sorted(import_time(cache_path) for _ in range(runs))
+        points = sorted(float(run(cache_path, '-c', first_point).stdout) for _ in range(runs))
+        results[label] = (imports[runs // 2], points[runs // 2])
+    return results
+
@@ -0,0 +1,33 @@
+"""
+Command line for the compiled timezone cache of `tzcache`.
+
+Kept apart from `tzcache`, which the package imports, so that running this
+module does not find it in ``sys.modules`` already.
+
+Usage::
+
+    python -m <package>.tzcachetool build [--path PATH] [ZONE ...]
+    python -m <package>.tzcachetool benchmark [--path PATH]
+"""
+from . import tzcache
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compiled timezone transition cache.')
+    parser.add_argument('command', choices=('build', 'benchmark'))
+    parser.add_argument('--path', default=None)
+    parser.add_argument('zones', nargs='*')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        print(tzcache.build(args.path, args.zones or None))
+        return
+
+    for label, (imports, point) in tzcache.benchmark(args.path).items():
+        print(f'{label:>8}: import {imports * 1000:7.2f} ms, first Point {point * 1000:7.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Incremental windowing of ``(Point, value)`` event streams.
+
+Events may arrive out of order. The watermark trails the latest event time
+by an allowed lateness; windows ending at or before the watermark are
+closed and emitted as ``(Range, aggregate)`` in order of their end, and
+events falling only into already closed windows are late. State is limited
+to the windows that are still open.
+"""
+import heapq
+
+from . import buckets
+from .classes import Range, Timestamp, Timezone
+
+
+def _append(acc, value):
+    acc.append(value)
+    return acc
+
+
+def _extend(acc, other):
+    acc.extend(other)
+    return acc
+
+
+class _Windows:
+    def __init__(self, reduce=None, initial=None, lateness=None, late=None, timezone=None):
+        """
+        :param reduce: ``reduce(acc, value)`` returning the new aggregate;
+            defaults to collecting values in a list.
+        :param initial: factory of an empty aggregate; defaults to `list`.
+        :param lateness: exact Delta the watermark trails the latest event.
+        :param late: ``late(point, value)`` called for late events, which are
+            dropped otherwise.
+        :param timezone: Timezone of emitted Ranges; defaults to the
+            timezone of the first event.
+        """
+        self._reduce = reduce or _append
+        self._initial = initial or list
+        self._lateness = 0 if lateness is None else lateness._picoseconds
+        self._late = late
+        self._timezone = None if timezone is None else Timezone(timezone)
+        self._watermark = None
+
+    @property
+    def watermark(self):
+        return None if self._watermark is None else Timestamp.from_ps(self._watermark)
+
+    def push(self, point, value):
+        """Add an event, returning the windows it closed."""
+        if self._timezone is None:
+            self._timezone = point.timezone
+        t = point.timestamp._value
+
+        if not self._add(t, point, value) and self._late is not None:
+            self._late(point, value)
+
+        watermark = t - self._lateness
+        if self._watermark is None or watermark > self._watermark:
+            self._watermark = watermark
+            return self._close(watermark)
+        return []
+
+    def advance(self, watermark):
+        """Move the watermark to a Point or Timestamp, returning closed windows."""
+        watermark = getattr(watermark, 'timestamp', watermark)._value
+        if self._watermark is not None and watermark <= self._watermark:
+            return []
+        self._watermark = watermark
+        return self._close(watermark)
+
+    def flush(self):
+        """Close and return all open windows."""
+        return self._close(None)
+
+    def process(self, events):
+        """Window an iterable of ``(point, value)``, flushing at its end."""
+        for point, value in events:
+            yield from self.push(point, value)
+        yield from self.flush()
+
+    async def aprocess(self, events):
+        """Window an async iterable of ``(point, value)``, flushing at its end."""
+        async for point, value in events:
+            for window in self.push(point, value):
+                yield window
+        for window in self.flush():
+            yield window
+
+    def _range(self, start, end):
+        return Range(Timestamp.from_ps(start), Timestamp.from_ps(end), self._timezone)
+
+    def _add(self, t, point, value):
+        raise NotImplementedError()
+
+    def _close(self, watermark):
+        raise NotImplementedError()
+
+
+class _FixedWindows(_Windows):
+    def __init__(self, size, step, align=None, **kwargs):
+        super().__init__(**kwargs)
+        self.__size = size._picoseconds
+        self.__step = step._picoseconds
+        if self.__size <= 0 or self.__step <= 0:
+            raise ValueError('Window size and step must be positive.')
+        self.__align = align
+        self.__origin = None if align is not None else 0
+        self.__open = {}
+        self.__ends = []
+
+    def _add(self, t, point, value):
+        if self.__origin is None:
+            self.__origin = buckets.floor(point, self.__align, self._timezone)._value
+
+        size, step, origin = self.__size, self.__step, self.__origin
+        first = origin + ((t - size - origin) // step + 1) * step
+        added = False
+        for start in range(first, t + 1, step):
+            end = start + size
+            if self._watermark is not None and end <= self._watermark:
+                continue
+            window = self.__open.get(start)
+            if window is None:
+                window = self.__open[start] = [self._initial()]
+                heapq.heappush(self.__ends, (end, start))
+            window[0] = self._reduce(window[0], value)
+            added = True
+        return added
+
+    def _close(self, watermark):
+        closed = []
+        while self.__ends and (watermark is None or self.__ends[0][0] <= watermark):
+            end, start = heapq.heappop(self.__ends)
+            closed.append((self._range(start, end), self.__open.pop(start)[0]))
+        return closed
+
+
+class TumblingWindows(_FixedWindows):
+    """
+    Consecutive, non-overlapping windows of an exact Delta ``size``.
+
+    With ``align`` (a Unit) windows start at the start of the bucket of that
+    unit containing the first event, otherwise at multiples of ``size``
+    since the epoch.
+    """
+
+    def __init__(self, size, align=None, **kwargs):
+        super().__init__(size, size, align, **kwargs)
+
+
+class SlidingWindows(_FixedWindows):
+    """Windows of an exact Delta ``size`` starting every ``step``."""
+
+    def __init__(self, size, step, align=None, **kwargs):
+        super().__init__(size, step, align, **kwargs)
+
+
+class SessionWindows(_Windows):
+    """
+    Windows of activity separated by more than an exact Delta ``gap``.
+
+    A session spans from its first event to its last event plus ``gap``.
+    ``combine(acc, other)`` merges the aggregates of sessions joined by a
+    bridging event; it defaults to extending lists.
+    """
+
+    def __init__(self, gap, combine=None, **kwargs):
+        super().__init__(**kwargs)
+        self.__gap = gap._picoseconds
+        if self.__gap <= 0:
+            raise ValueError('Session gap must be positive.')
+        self.__combine = combine or _extend
+        self.__open = []
+
+    def _add(self, t, point, value):
+        gap = self.__gap
+        if self._watermark is not None and t + gap < self._watermark:
+            return False
+
+        session = [t, t + gap, self._reduce(self._initial(), value)]
+        remaining = []
+        for other in self.__open:
+            if other[0] - gap <= t <= other[1]:
+                first, second = (other, session) if other[0] <= session[0] else (session, other)
+                session = [first[0], max(first[1], second[1]),
+                           self.__combine(first[2], second[2])]
+            else:
+                remaining.append(other)
+        remaining.append(session)
+        self.__open = remaining
+        return True
+
+    def _close(self, watermark):
+        # An event at a session's end still joins it, so close it once past.
+        closed = [s for s in self.__open if watermark is None or s[1] < watermark]
+        if not closed:
+            return []
+        self.__open = [s for s in self.__open if watermark is not None and s[1] >= watermark]
+        closed.sort(key=lambda s: (s[1], s[0]))
+        return [(self._range(start, end), acc) for start, end, acc in closed]